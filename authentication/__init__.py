@@ -1,6 +1,22 @@
-from .jwt_authentication import JWTAuthentication
+from typing import TYPE_CHECKING
+
+from ..utils.lazy import lazyExports
+
+if TYPE_CHECKING:
+    from .jwt_authentication import JWTAuthentication, JWTClaimsAuthentication, AsyncJWTAuthentication
+    from .token_user import TokenUser
 
 
 __all__ = [
-    "JWTAuthentication"
+    "JWTAuthentication",
+    "JWTClaimsAuthentication",
+    "AsyncJWTAuthentication",
+    "TokenUser",
 ]
+
+__getattr__, __dir__ = lazyExports(__name__, {
+    "JWTAuthentication": ".jwt_authentication",
+    "JWTClaimsAuthentication": ".jwt_authentication",
+    "AsyncJWTAuthentication": ".jwt_authentication",
+    "TokenUser": ".token_user",
+})
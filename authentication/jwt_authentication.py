@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework import exceptions
 from rest_framework.request import Request
 from rest_framework.authentication import BaseAuthentication
-from ..utils.crypto.jwt_ import JWTHandler
+from ..utils.context import timed, timing
+from ..utils.crypto.jwt_ import JWTHandler, getUserClaims, getUserIdClaim
+from .token_user import TokenUser
 
 # User = get_user_model()
 
@@ -10,12 +13,25 @@ from ..utils.crypto.jwt_ import JWTHandler
 class JWTAuthentication(BaseAuthentication):
     """
     JWT 认证
+
+    settings:
+        JWT_CLAIMS_ONLY: 为 True 时返回基于令牌声明的 TokenUser，不查询数据库
+        JWT_USER_CLAIMS: 声明名 => 用户属性名 映射，默认 {"user_id": "id"}
     """
+    # 为 None 时读取 settings.JWT_CLAIMS_ONLY
+    claims_only = None
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self.user_model = get_user_model()
+        # 与 JWTHandler 签发时使用同一映射
+        self.user_claims = getUserClaims()
+        # 查询数据库时使用的用户 id 声明
+        self.user_id_claim = getUserIdClaim(self.user_claims)
+        if self.claims_only is None:
+            self.claims_only = getattr(settings, "JWT_CLAIMS_ONLY", False)
 
+    @timed("auth")
     def authenticate(self, request: Request):
         token = self.getToken(request)
         if not token:
@@ -31,7 +47,7 @@ class JWTAuthentication(BaseAuthentication):
         if isinstance(token, bytes):
             token = token.decode()
 
-        return token.strip()
+        return token.strip() if token else token
 
     def getValidatedToken(self, token: str) -> str:
         try:
@@ -45,11 +61,66 @@ class JWTAuthentication(BaseAuthentication):
         """
         尝试使用已验证的令牌查找并找回用户。
         """
+        if self.claims_only:
+            return self.getTokenUser(validated_token)
+
+        try:
+            user = self.user_model.objects.get(pk=validated_token[self.user_id_claim])
+        except self.user_model.DoesNotExist as e:
+            raise exceptions.AuthenticationFailed("用户不存在！") from e
+        except Exception as e:
+            raise exceptions.AuthenticationFailed("用户不存在！") from e
+        return user
 
+    async def agetUser(self, validated_token: str):
+        """
+        getUser 的异步版本（异步 ORM aget）
+        """
+        if self.claims_only:
+            return self.getTokenUser(validated_token)
         try:
-            user = self.user_model.objects.get(id=validated_token["user_id"])
-        except self.user_model.DoesNotExist:
+            user = await self.user_model.objects.aget(pk=validated_token[self.user_id_claim])
+        except self.user_model.DoesNotExist as e:
             raise exceptions.AuthenticationFailed("用户不存在！") from e
         except Exception as e:
             raise exceptions.AuthenticationFailed("用户不存在！") from e
         return user
+
+    def getTokenUser(self, validated_token: dict) -> TokenUser:
+        """由令牌声明构建轻量用户，访问声明以外的属性时才查询数据库"""
+        user = TokenUser(validated_token, self.user_claims, self.user_model)
+        if user.pk is None:
+            raise exceptions.AuthenticationFailed("用户不存在！")
+        return user
+
+    async def aauthenticate(self, request: Request):
+        """
+        异步认证
+        ===
+        令牌解码为纯 CPU 计算（微秒级），直接在事件循环中执行；用户查询走异步 ORM
+        """
+        with timing("auth"):
+            token = self.getToken(request)
+            if not token:
+                raise exceptions.NotAuthenticated("未提供授权信息")
+            validated_token = self.getValidatedToken(token)
+            return await self.agetUser(validated_token), token
+
+
+class JWTClaimsAuthentication(JWTAuthentication):
+    """
+    仅基于令牌声明的 JWT 认证（不查询数据库）
+    """
+    claims_only = True
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """
+    异步 JWT 认证
+
+    authenticate 为协程函数，供异步 DRF 视图（如 adrf.views.APIView）直接 await，
+    不再经由 sync_to_async 转入同步线程池
+    """
+
+    async def authenticate(self, request: Request):
+        return await self.aauthenticate(request)
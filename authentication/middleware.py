@@ -0,0 +1,66 @@
+"""
+JWT 认证中间件
+
+对标 django.contrib.auth.middleware.AuthenticationMiddleware：
+request.user 为惰性对象（同步访问时才查询），request.auser() 为异步获取，
+异步请求链路中通过异步 ORM 查询用户，不占用同步线程池。
+"""
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.contrib.auth.models import AnonymousUser
+from django.utils.functional import SimpleLazyObject
+from rest_framework import exceptions
+
+from .jwt_authentication import JWTAuthentication
+
+
+def getUser(request, authentication: JWTAuthentication):
+    if not hasattr(request, "_cached_user"):
+        try:
+            user_auth = authentication.authenticate(request)
+        except exceptions.APIException:
+            user_auth = None
+        request._cached_user = user_auth[0] if user_auth else AnonymousUser()
+    return request._cached_user
+
+
+async def auser(request, authentication: JWTAuthentication):
+    if not hasattr(request, "_acached_user"):
+        try:
+            user_auth = await authentication.aauthenticate(request)
+        except exceptions.APIException:
+            user_auth = None
+        request._acached_user = user_auth[0] if user_auth else AnonymousUser()
+    return request._acached_user
+
+
+class JWTAuthenticationMiddleware:
+    """
+    JWT 认证中间件（同步/异步均可）
+
+    令牌缺失或无效时 request.user 为 AnonymousUser，不在中间件中抛出异常，
+    由视图层的权限类决定是否拒绝访问
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.authentication = JWTAuthentication()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.processRequest(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.processRequest(request)
+        return await self.get_response(request)
+
+    def processRequest(self, request) -> None:
+        request.user = SimpleLazyObject(lambda: getUser(request, self.authentication))
+        request.auser = partial(auser, request, self.authentication)
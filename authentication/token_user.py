@@ -0,0 +1,78 @@
+"""
+基于令牌声明的轻量用户
+
+只需要 id / 角色等令牌中已有信息的接口无需查询数据库；
+访问声明以外的属性时才惰性加载真实用户对象。
+"""
+from typing import Any, Mapping, Optional
+
+
+class TokenUser:
+    """
+    令牌用户
+    ===
+    Args:
+        claims: 已验证的令牌载荷
+        user_claims: 声明名 => 用户属性名 映射（与 JWTHandler.user_claims 一致）
+        user_model: 用户模型，访问非声明属性时用于加载真实用户
+    """
+    __slots__ = ("_attrs", "_user", "_user_model")
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, claims: Mapping[str, Any], user_claims: Mapping[str, str], user_model=None):
+        self._attrs = {attr: claims[claim] for claim, attr in user_claims.items() if claim in claims}
+        self._user = None
+        self._user_model = user_model
+
+    @property
+    def id(self) -> Any:
+        return self._attrs.get("id")
+
+    @property
+    def pk(self) -> Any:
+        return self._attrs.get("id")
+
+    @property
+    def claims(self) -> dict:
+        """令牌中还原出的属性"""
+        return dict(self._attrs)
+
+    def getUser(self):
+        """加载真实用户对象（结果缓存在实例上）"""
+        if self._user is None:
+            if self._user_model is None:
+                raise AttributeError("TokenUser 未关联用户模型，无法加载真实用户")
+            self._user = self._user_model._default_manager.get(pk=self.pk)
+        return self._user
+
+    async def agetUser(self):
+        """getUser 的异步版本"""
+        if self._user is None:
+            if self._user_model is None:
+                raise AttributeError("TokenUser 未关联用户模型，无法加载真实用户")
+            self._user = await self._user_model._default_manager.aget(pk=self.pk)
+        return self._user
+
+    def __getattr__(self, name: str) -> Any:
+        # 仅在常规属性查找失败时调用：先查声明，再回落到真实用户
+        if name in TokenUser.__slots__:
+            raise AttributeError(name)
+        attrs = self._attrs
+        if name in attrs:
+            return attrs[name]
+        return getattr(self.getUser(), name)
+
+    def __str__(self) -> str:
+        return str(self._attrs.get("username", self.pk))
+
+    def __repr__(self) -> str:
+        return f"<TokenUser pk={self.pk!r}>"
+
+    def __eq__(self, other: object) -> bool:
+        other_pk: Optional[Any] = getattr(other, "pk", None)
+        return other_pk is not None and str(other_pk) == str(self.pk)
+
+    def __hash__(self) -> int:
+        return hash(str(self.pk))
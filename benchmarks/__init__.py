@@ -0,0 +1,8 @@
+"""
+性能基准测试
+
+运行方式（在包的上级目录执行，<pkg> 为本包目录名）：
+    python -m <pkg>.benchmarks --output results.json
+    python -m <pkg>.benchmarks --compare baseline.json --threshold 0.1
+    python -m <pkg>.benchmarks.importtime          # 导入耗时明细（-X importtime）
+"""
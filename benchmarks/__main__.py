@@ -0,0 +1,37 @@
+import argparse
+import json
+import sys
+
+from . import bootstrap
+from .runner import BenchmarkRunner, compare
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="性能基准测试")
+    parser.add_argument("--output", "-o", help="结果 JSON 输出路径")
+    parser.add_argument("--compare", "-c", help="基线结果 JSON 路径")
+    parser.add_argument("--threshold", type=float, default=0.1, help="允许的性能回退比例（默认 0.1 即 10%%）")
+    parser.add_argument("--filter", "-k", dest="name_filter", help="只运行名称包含该子串的用例")
+    parser.add_argument("--repeat", type=int, default=5, help="每个用例的重复轮数")
+    parser.add_argument("--min-time", type=float, default=0.2, help="单轮最短耗时（秒）")
+    args = parser.parse_args(argv)
+
+    has_redis = bootstrap.configure()
+    from .cases import runAll
+
+    runner = BenchmarkRunner(repeat=args.repeat, min_time=args.min_time, name_filter=args.name_filter)
+    runAll(runner, has_redis)
+    current = runner.dump(args.output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print("性能回退：\n  " + "\n  ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
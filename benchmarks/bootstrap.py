@@ -0,0 +1,71 @@
+"""
+基准测试运行环境：独立的 Django 配置（SQLite 内存库 + Redis/fakeredis）
+"""
+import logging
+import os
+
+import django
+from django.conf import settings
+
+APP_LABEL = __package__
+
+
+def redisOptions() -> dict:
+    """
+    Redis 连接配置
+    ===
+    设置 BENCH_REDIS_URL 时连接真实 Redis（推荐，结果更接近线上），
+    否则尝试使用 fakeredis 内存实现；两者都不可用时返回空字典，缓存相关用例跳过
+    """
+    url = os.environ.get("BENCH_REDIS_URL")
+    if url:
+        return {"LOCATION": url, "OPTIONS": {}}
+    try:
+        import fakeredis
+    except ImportError:
+        return {}
+    return {
+        "LOCATION": "redis://localhost:6379/0",
+        "OPTIONS": {
+            "CONNECTION_POOL_KWARGS": {
+                "connection_class": fakeredis.FakeConnection,
+                "server": fakeredis.FakeServer(),
+            }
+        },
+    }
+
+
+def configure() -> bool:
+    """
+    初始化 Django
+    ===
+    Returns:
+        是否有可用的 Redis
+    """
+    redis_options = redisOptions()
+    caches = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    if redis_options:
+        caches = {"default": {"BACKEND": "django_redis.cache.RedisCache", **redis_options}}
+
+    if not settings.configured:
+        settings.configure(
+            DEBUG=False,
+            SECRET_KEY="benchmark",
+            USE_TZ=True,
+            INSTALLED_APPS=[
+                "django.contrib.contenttypes",
+                "django.contrib.auth",
+                "rest_framework",
+                APP_LABEL,
+            ],
+            DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+            CACHES=caches,
+            PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+        )
+    django.setup()
+    # 屏蔽业务日志输出（如 EncryptedField 的解密失败日志），避免终端 IO 干扰计时
+    logging.disable(logging.ERROR)
+
+    from django.core.management import call_command
+    call_command("migrate", run_syncdb=True, verbosity=0)
+    return bool(redis_options)
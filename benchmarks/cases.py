@@ -0,0 +1,165 @@
+"""
+基准测试用例
+
+覆盖加解密、JWT、认证、缓存、加密字段与响应渲染等热点路径，以及各子包的导入耗时
+"""
+import datetime
+import decimal
+import os
+
+from .runner import BenchmarkRunner
+
+PAYLOAD_SIZES = {
+    "64B": 64,
+    "1KiB": 1024,
+    "16KiB": 16 * 1024,
+    "256KiB": 256 * 1024,
+}
+
+ROW_COUNTS = (10, 1_000, 100_000)
+
+
+def _text(size: int) -> str:
+    return ("a1b2c3d4" * (size // 8 + 1))[:size]
+
+
+def _rows(count: int) -> list:
+    created_at = datetime.datetime(2025, 1, 1, 12, 0, 0)
+    return [
+        {
+            "id": i,
+            "username": f"user{i}",
+            "nickname": "测试用户",
+            "balance": decimal.Decimal("10.25"),
+            "is_active": True,
+            "created_at": created_at,
+        }
+        for i in range(count)
+    ]
+
+
+def benchCrypto(runner: BenchmarkRunner) -> None:
+    from ..utils.crypto.aes import AESHandler
+    from ..utils.crypto.jwt_ import JWTHandler
+
+    aes = AESHandler()
+    for label, size in PAYLOAD_SIZES.items():
+        plain = _text(size)
+        encrypted = aes.encrypt(plain)
+        runner.bench(f"aes.encrypt[{label}]", lambda: aes.encrypt(plain), bytes=size)
+        runner.bench(f"aes.decrypt[{label}]", lambda: aes.decrypt(encrypted), bytes=size)
+
+    jwt_handler = JWTHandler()
+    payload = {"user_id": 1, "role": "admin"}
+    token = jwt_handler.encode(payload)
+    runner.bench("jwt.encode", lambda: jwt_handler.encode(payload))
+    runner.bench("jwt.decode", lambda: jwt_handler.decode(token))
+
+
+def benchCryptoBackends(runner: BenchmarkRunner) -> None:
+    """逐个后端对比 AES 加解密吞吐量（MB/s）"""
+    from ..utils.crypto.aes import AESHandler
+    from ..utils.crypto.backends import availableBackends
+
+    for backend in availableBackends():
+        aes = AESHandler(backend=backend)
+        for label, size in PAYLOAD_SIZES.items():
+            plain = _text(size)
+            encrypted = aes.encrypt(plain)
+            for op, func in (("encrypt", lambda: aes.encrypt(plain)), ("decrypt", lambda: aes.decrypt(encrypted))):
+                result = runner.bench(f"aes.{op}.{backend}[{label}]", func, bytes=size)
+                if result:
+                    result["mb_per_s"] = round(size / result["median"] / 1e6, 2)
+                    print(f"{'':<48} {result['mb_per_s']:>12.2f} MB/s", flush=True)
+
+
+def benchAuthentication(runner: BenchmarkRunner) -> None:
+    from django.contrib.auth import get_user_model
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from ..authentication.jwt_authentication import JWTAuthentication
+    from ..utils.crypto.jwt_ import JWTHandler
+
+    user_model = get_user_model()
+    user, _ = user_model.objects.get_or_create(username="bench")
+    token = JWTHandler().encode({"user_id": user.pk})
+    request = Request(APIRequestFactory().get("/", HTTP_AUTHORIZATION=token))
+    authentication = JWTAuthentication()
+    runner.bench("auth.jwt.authenticate", lambda: authentication.authenticate(request))
+
+
+def benchCache(runner: BenchmarkRunner) -> None:
+    from ..utils.cache.data_cache import DataCache
+    from ..utils.cache.redis import CommCache
+
+    for label, size in (("64B", 64), ("16KiB", 16 * 1024)):
+        value = _text(size)
+        key = f"bench:comm:{label}"
+        CommCache.set(key, value)
+        runner.bench(f"cache.comm.set[{label}]", lambda: CommCache.set(key, value), bytes=size)
+        runner.bench(f"cache.comm.get[{label}]", lambda: CommCache.get(key), bytes=size)
+        runner.bench(f"cache.comm.set.json[{label}]", lambda: CommCache.set(key, {"v": value}, json_ser=True), bytes=size)
+        runner.bench(f"cache.comm.get.json[{label}]", lambda: CommCache.get(key, json_ser=True), bytes=size)
+
+    token = "bench-session-token"
+    session = {"user_id": 1, "username": "bench", "permissions": [f"perm.{i}" for i in range(50)]}
+    DataCache.saveData(token, session)
+    runner.bench("cache.data.save", lambda: DataCache.saveData(token, session))
+    runner.bench("cache.data.get", lambda: DataCache.getData(token))
+    runner.bench("cache.data.update", lambda: DataCache.updateData(token, session))
+
+    def updateThrice():
+        DataCache.updateData(token, session, {"last_seen": 1})
+        DataCache.updateData(token, session, {"permissions": 2})
+        DataCache.updateData(token, session, {"preferences": 3})
+
+    def updateThriceBatched():
+        with DataCache.batch():
+            updateThrice()
+
+    runner.bench("cache.data.update[3x]", updateThrice)
+    runner.bench("cache.data.update.batched[3x]", updateThriceBatched)
+
+
+def benchEncryptedField(runner: BenchmarkRunner) -> None:
+    from .models import EncryptedRecord
+
+    secret = _text(256)
+    record = EncryptedRecord.objects.create(secret=secret)
+    pk = record.pk
+    runner.bench("field.encrypted.create", lambda: EncryptedRecord.objects.create(secret=secret))
+    runner.bench("field.encrypted.get", lambda: EncryptedRecord.objects.get(pk=pk))
+    EncryptedRecord.objects.exclude(pk=pk).delete()
+
+
+def benchResponse(runner: BenchmarkRunner) -> None:
+    from django.core.paginator import Paginator
+
+    from ..response.response import APIResponse, pageResponse, successResponse
+
+    for count in ROW_COUNTS:
+        rows = _rows(count)
+        paginator = Paginator(rows, count)
+        # 大数据量单轮耗时已足够长，固定调用次数避免校准耗时过久
+        number = 1 if count >= 100_000 else None
+        repeat = 3 if count >= 100_000 else None
+        runner.bench(f"response.success[{count}]", lambda: successResponse(rows), number=number, repeat=repeat, rows=count)
+        runner.bench(f"response.page[{count}]", lambda: pageResponse(paginator, 1, rows), number=number, repeat=repeat, rows=count)
+        runner.bench(f"response.success.fast[{count}]", lambda: APIResponse(data=rows).toFastJsonResponse(), number=number, repeat=repeat, rows=count)
+
+
+def runAll(runner: BenchmarkRunner, has_redis: bool) -> None:
+    if os.environ.get("BENCH_SKIP_IMPORTS") != "1":
+        from .importtime import benchImports
+        benchImports(runner)
+    benchCrypto(runner)
+    benchCryptoBackends(runner)
+    benchAuthentication(runner)
+    if has_redis:
+        benchCache(runner)
+    else:
+        print("未配置 BENCH_REDIS_URL 且未安装 fakeredis，跳过缓存用例", flush=True)
+    benchEncryptedField(runner)
+    if os.environ.get("BENCH_SKIP_RESPONSE") != "1":
+        benchResponse(runner)
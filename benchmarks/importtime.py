@@ -0,0 +1,150 @@
+"""
+导入耗时基准
+
+每次在全新的子进程中（python -X importtime）导入一个子包，统计导入耗时、
+最耗时的模块，以及导入后是否连带加载了 redis / pycryptodome / PyJWT 等重依赖。
+子进程先完成 Django 初始化，只统计本包自身导入的增量。
+
+运行方式（在包的上级目录执行，<pkg> 为本包目录名）：
+    python -m <pkg>.benchmarks.importtime
+    python -m <pkg>.benchmarks.importtime --detail 20 <pkg>.response
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+ROOT_PACKAGE = __package__.rpartition(".")[0]
+
+# 需要保持轻量的导入入口
+MODULES = (
+    "",
+    ".response",
+    ".exceptions",
+    ".authentication",
+    ".middleware",
+    ".models",
+    ".utils.cache",
+    ".utils.cache.redis",
+    ".utils.crypto",
+    ".models.fields",
+)
+
+# 导入包时不应连带加载的重依赖（只应在首次使用时加载）
+HEAVY_MODULES = ("redis", "django_redis", "Crypto", "jwt", "cryptography")
+
+_MARKER = "-- import start --"
+
+_SCRIPT = """
+import json, sys, time
+import django
+from django.conf import settings
+settings.configure(INSTALLED_APPS=["django.contrib.contenttypes", "django.contrib.auth", "rest_framework"])
+django.setup()
+before = set(sys.modules)
+sys.stderr.write({marker!r} + "\\n")
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": sorted(set(sys.modules) - before)}}))
+"""
+
+
+def moduleNames() -> List[str]:
+    return [ROOT_PACKAGE + suffix for suffix in MODULES]
+
+
+def parseImportTime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    解析 -X importtime 输出（只取标记之后的部分）
+    :return: [(模块名, 自身耗时us, 累计耗时us), ...]
+    """
+    _, _, stderr = stderr.partition(_MARKER)
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        entries.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return entries
+
+
+def importOnce(module: str) -> dict:
+    """在新的子进程中导入模块一次"""
+    env = dict(os.environ)
+    parent = str(Path(__file__).resolve().parents[2])
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [parent, env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SCRIPT.format(marker=_MARKER, module=module)],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=parent,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败：\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["entries"] = parseImportTime(proc.stderr)
+    return result
+
+
+def measure(module: str, repeat: int = 5) -> dict:
+    """
+    多次测量取中位数
+    :return: {"samples": 各次耗时（秒）, "heavy": 连带加载的重依赖, "top": 自身耗时最高的模块}
+    """
+    runs = [importOnce(module) for _ in range(repeat)]
+    loaded = runs[-1]["loaded"]
+    heavy = sorted({name.partition(".")[0] for name in loaded} & set(HEAVY_MODULES))
+    top = sorted(runs[-1]["entries"], key=lambda entry: entry[1], reverse=True)
+    return {
+        "samples": [run["elapsed"] for run in runs],
+        "modules": len(loaded),
+        "heavy": heavy,
+        "top": [(name, self_us) for name, self_us, _ in top],
+    }
+
+
+def benchImports(runner, modules: Optional[Sequence[str]] = None) -> Dict[str, dict]:
+    """作为基准用例运行，结果写入 runner（参与 --compare 对比）"""
+    results = {}
+    for module in modules or moduleNames():
+        name = f"import[{module}]"
+        if not runner.selected(name):
+            continue
+        result = measure(module, repeat=runner.repeat)
+        results[module] = runner.record(name, result["samples"], modules=result["modules"], heavy=result["heavy"])
+        if result["heavy"]:
+            print(f"  {module} 导入时加载了：{', '.join(result['heavy'])}", flush=True)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="导入耗时基准")
+    parser.add_argument("modules", nargs="*", help="要测量的模块，默认为各子包")
+    parser.add_argument("--repeat", type=int, default=5, help="每个模块的测量次数")
+    parser.add_argument("--detail", type=int, default=10, help="列出自身耗时最高的前 N 个模块")
+    parser.add_argument("--strict", action="store_true", help="有子包导入时加载了重依赖则返回非 0")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules or moduleNames():
+        result = measure(module, repeat=args.repeat)
+        median = statistics.median(result["samples"])
+        print(f"{module:<40} {median * 1e3:>9.2f} ms  新增模块 {result['modules']}")
+        if result["heavy"]:
+            failed = True
+            print(f"  连带加载：{', '.join(result['heavy'])}")
+        for name, self_us in result["top"][:args.detail]:
+            print(f"    {self_us / 1e3:>8.2f} ms  {name}")
+    return 1 if failed and args.strict else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+from django.db import models
+
+from ..models.fields import EncryptedField
+
+
+class EncryptedRecord(models.Model):
+    """EncryptedField 读写基准使用的模型"""
+
+    secret = EncryptedField(verbose_name="加密内容")
+
+    class Meta:
+        app_label = "benchmarks"
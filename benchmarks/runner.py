@@ -0,0 +1,129 @@
+"""
+基准测试执行器：计时、统计、结果保存与基线对比
+"""
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+class BenchmarkRunner:
+    """
+    基准测试执行器
+    ===
+    每个用例先自动校准单轮调用次数（单轮不少于 min_time 秒），再重复 repeat 轮，
+    以单次调用耗时的中位数作为主要指标
+    """
+
+    def __init__(self, repeat: int = 5, min_time: float = 0.2, name_filter: Optional[str] = None):
+        self.repeat = repeat
+        self.min_time = min_time
+        self.name_filter = name_filter
+        self.results: Dict[str, dict] = {}
+
+    def bench(self, name: str, func: Callable[[], object], number: Optional[int] = None, repeat: Optional[int] = None, **extra) -> Optional[dict]:
+        """
+        执行单个用例
+        ===
+        Args:
+            name: 用例名称（如 "aes.encrypt[1KiB]"）
+            func: 无参可调用对象
+            number: 单轮调用次数，为空时自动校准
+            repeat: 重复轮数，为空时使用执行器默认值
+            **extra: 附加到结果中的元信息（如 payload 字节数）
+        """
+        if not self.selected(name):
+            return None
+
+        timer = timeit.Timer(func)
+        if number is None:
+            number = self._calibrate(timer)
+        samples = [t / number for t in timer.repeat(repeat=repeat or self.repeat, number=number)]
+        return self.record(name, samples, number, **extra)
+
+    def selected(self, name: str) -> bool:
+        """用例是否在 --filter 范围内"""
+        return not self.name_filter or self.name_filter in name
+
+    def record(self, name: str, samples: List[float], number: int = 1, **extra) -> dict:
+        """
+        记录一组单次耗时样本（秒），用于无法用 timeit 重复调用的用例（如子进程导入耗时）
+        """
+        median = statistics.median(samples)
+        result = {
+            "number": number,
+            "rounds": len(samples),
+            "min": min(samples),
+            "max": max(samples),
+            "mean": statistics.fmean(samples),
+            "median": median,
+            "stddev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            "ops": 1 / median if median else None,
+            **extra,
+        }
+        self.results[name] = result
+        print(f"{name:<48} {median * 1e6:>12.2f} us/op  ({number} x {len(samples)})", flush=True)
+        return result
+
+    def _calibrate(self, timer: timeit.Timer) -> int:
+        number = 1
+        while True:
+            elapsed = timer.timeit(number)
+            if elapsed >= self.min_time:
+                return number
+            number *= 2 if elapsed == 0 else max(2, min(10, int(self.min_time / elapsed) + 1))
+
+    def dump(self, path: Optional[str] = None) -> dict:
+        """结果转为 JSON（可写入文件，供 CI 与基线对比）"""
+        payload = {"meta": environmentInfo(), "results": self.results}
+        if path:
+            Path(path).write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+        return payload
+
+
+def environmentInfo() -> dict:
+    """记录运行环境，便于判断对比结果是否可信"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.1) -> List[str]:
+    """
+    与基线对比
+    ===
+    中位耗时超过基线 (1 + threshold) 倍的用例视为性能回退，返回回退用例的描述
+    """
+    regressions = []
+    base_results = baseline.get("results", {})
+    for name, result in sorted(current.get("results", {}).items()):
+        base = base_results.get(name)
+        if not base or not base.get("median"):
+            continue
+        ratio = result["median"] / base["median"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  <-- 回退"
+            regressions.append(f"{name}: {ratio:.2f}x")
+        print(f"{name:<48} {base['median'] * 1e6:>12.2f} -> {result['median'] * 1e6:>12.2f} us/op  {ratio:>6.2f}x{flag}")
+    return regressions
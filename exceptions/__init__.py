@@ -1,8 +1,26 @@
-from .exception import (
-    BusinessException,
-    ValidationException,
-    AuthenticationException,
-    AuthorizationException,
-    NotFoundException,
-    RateLimitException
-)
+from typing import TYPE_CHECKING
+
+from ..utils.lazy import lazyExports
+
+if TYPE_CHECKING:
+    from .exception import (
+        BaseAPIException,
+        BusinessException,
+        ValidationException,
+        AuthenticationException,
+        AuthorizationException,
+        NotFoundException,
+        RateLimitException
+    )
+    from .handler import exception_handler
+
+__getattr__, __dir__ = lazyExports(__name__, {
+    "BaseAPIException": ".exception",
+    "BusinessException": ".exception",
+    "ValidationException": ".exception",
+    "AuthenticationException": ".exception",
+    "AuthorizationException": ".exception",
+    "NotFoundException": ".exception",
+    "RateLimitException": ".exception",
+    "exception_handler": ".handler",
+})
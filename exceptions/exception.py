@@ -8,6 +8,8 @@ from ..response.status import CommonStatus
 class BaseAPIException(Exception):
     """API异常基类"""
 
+    __slots__ = ("code", "message", "data", "extra_data")
+
     def __init__(
         self,
         code: CommonStatus = CommonStatus.INTERNAL_SERVER_ERROR,
@@ -25,6 +27,8 @@ class BaseAPIException(Exception):
 class BusinessException(BaseAPIException):
     """业务异常"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "业务处理异常",
@@ -42,6 +46,8 @@ class BusinessException(BaseAPIException):
 class ValidationException(BaseAPIException):
     """参数验证异常"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "参数验证失败",
@@ -59,6 +65,8 @@ class ValidationException(BaseAPIException):
 class AuthenticationException(BaseAPIException):
     """认证异常"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "认证失败",
@@ -76,6 +84,8 @@ class AuthenticationException(BaseAPIException):
 class AuthorizationException(BaseAPIException):
     """授权异常"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "权限不足",
@@ -93,6 +103,8 @@ class AuthorizationException(BaseAPIException):
 class NotFoundException(BaseAPIException):
     """资源不存在异常"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "资源不存在",
@@ -110,6 +122,8 @@ class NotFoundException(BaseAPIException):
 class RateLimitException(BaseAPIException):
     """频率限制异常"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "请求过于频繁",
@@ -0,0 +1,97 @@
+"""
+DRF 异常处理模块
+
+settings.REST_FRAMEWORK["EXCEPTION_HANDLER"] 指向 exception_handler，
+统一把业务异常与 DRF/Django 异常转换为 errorResponse 信封。
+"""
+import logging
+from typing import Any, Optional
+
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from rest_framework import exceptions
+from rest_framework.views import set_rollback
+
+from ..response.response import APIResponse, errorResponse
+from ..response.status import CommonStatus
+from .exception import BaseAPIException
+
+logger = logging.getLogger(__name__)
+
+
+def _releaseTraceback(exc: BaseException) -> None:
+    """
+    释放已处理异常上的回溯信息
+    ===
+    回溯持有整条调用栈的帧对象（及其局部变量），与异常形成引用环，
+    只能等待 GC 回收；预期内的 4xx 异常不需要回溯，直接断开引用
+    """
+    exc.__traceback__ = None
+    exc.__context__ = None
+    exc.__cause__ = None
+
+
+def _detailMessage(detail: Any, default: str) -> str:
+    """DRF detail 为字符串时作为 msg，否则使用默认信息"""
+    if isinstance(detail, str):
+        return str(detail)
+    return default
+
+
+def exception_handler(exc: Exception, context: dict) -> Optional[Any]:
+    """
+    统一异常处理
+    ===
+    - BaseAPIException: 按异常自带的状态码与信息返回
+    - ValidationError: 信封 code 为 422，results 为字段错误详情，HTTP 状态码保持 DRF 的 400
+    - 其余 APIException / Http404 / PermissionDenied: 按 HTTP 状态码映射
+    - 其他异常返回 None，交给 Django 按 500 处理并记录
+    """
+    if isinstance(exc, BaseAPIException):
+        set_rollback()
+        if exc.code.code >= 500:
+            logger.error("业务异常: %s", exc.message, exc_info=exc)
+        else:
+            logger.debug("业务异常: %s %s", exc.code.code, exc.message)
+            _releaseTraceback(exc)
+        # extra_data 整体作为附加字段，避免其中的 code/message/data 等键与参数冲突
+        api_response = APIResponse(exc.code, exc.message, exc.data)
+        api_response.extra = dict(exc.extra_data)
+        return api_response.toJsonResponse()
+
+    if isinstance(exc, Http404):
+        exc = exceptions.NotFound(*exc.args)
+    elif isinstance(exc, PermissionDenied):
+        exc = exceptions.PermissionDenied(*exc.args)
+
+    if not isinstance(exc, exceptions.APIException):
+        return None
+
+    set_rollback()
+    if isinstance(exc, exceptions.ValidationError):
+        code = CommonStatus.VALIDATE_ERROR
+        response = errorResponse(code, code.message, exc.detail)
+    else:
+        default = CommonStatus.INTERNAL_SERVER_ERROR if exc.status_code >= 500 else CommonStatus.BAD_REQUEST
+        code = CommonStatus.getByCode(exc.status_code, default=default)
+        response = errorResponse(
+            code,
+            _detailMessage(exc.detail, code.message),
+            None if isinstance(exc.detail, str) else exc.detail,
+        )
+    # 保留原始 HTTP 状态码（未在 CommonStatus 中定义的状态码也不被改写）
+    response.status_code = exc.status_code
+
+    auth_header = getattr(exc, "auth_header", None)
+    if auth_header:
+        response["WWW-Authenticate"] = auth_header
+    wait = getattr(exc, "wait", None)
+    if wait is not None:
+        response["Retry-After"] = "%d" % wait
+
+    if exc.status_code >= 500:
+        logger.error("接口异常: %s", exc.detail, exc_info=exc)
+    else:
+        logger.debug("接口异常: %s %s", exc.status_code, exc.detail)
+        _releaseTraceback(exc)
+    return response
@@ -0,0 +1,78 @@
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from ...models.base_manager import BulkCreateUsersError
+
+
+def readCsv(path: Path) -> Iterator[Dict[str, Any]]:
+    """逐行读取 CSV（首行为表头），空值不传入模型以使用字段默认值"""
+    with path.open(encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            yield {key: value for key, value in row.items() if key and value != ""}
+
+
+def readJsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """逐行读取 JSON Lines"""
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+class Command(BaseCommand):
+    help = "从 CSV / JSONL 文件批量导入用户（多进程哈希密码，分批写库，支持断点续传）"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV 或 JSONL 文件路径")
+        parser.add_argument("--format", choices=("csv", "jsonl"), help="文件格式，默认按扩展名判断")
+        parser.add_argument("--batch-size", type=int, default=1000, help="每批次行数")
+        parser.add_argument("--workers", type=int, default=None, help="哈希进程数，默认 CPU 核数")
+        parser.add_argument("--state-file", help="续传位置文件，默认 <path>.progress")
+        parser.add_argument("--restart", action="store_true", help="忽略已有续传位置，从头开始")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"文件不存在：{path}")
+        fmt = options["format"] or ("csv" if path.suffix.lower() == ".csv" else "jsonl")
+        rows = readCsv(path) if fmt == "csv" else readJsonl(path)
+
+        manager = get_user_model()._default_manager
+        if not hasattr(manager, "bulk_create_users"):
+            raise CommandError("当前用户模型的管理器不支持 bulk_create_users（需继承 BaseUserManager）")
+
+        state_file = Path(options["state_file"] or f"{path}.progress")
+        start = 0
+        if state_file.exists() and not options["restart"]:
+            start = int(state_file.read_text().strip() or 0)
+            self.stdout.write(f"从第 {start} 行继续导入")
+
+        began = time.monotonic()
+
+        def progress(processed: int) -> None:
+            state_file.write_text(str(processed))
+            elapsed = time.monotonic() - began
+            rate = (processed - start) / elapsed if elapsed else 0
+            self.stdout.write(f"已导入 {processed} 行（{rate:.0f} 行/秒）")
+
+        try:
+            created = manager.bulk_create_users(
+                rows,
+                batch_size=options["batch_size"],
+                workers=options["workers"],
+                start=start,
+                progress=progress,
+            )
+        except BulkCreateUsersError as e:
+            state_file.write_text(str(e.processed))
+            raise CommandError(f"{e}\n续传位置已保存到 {state_file}，重新执行同一命令即可继续") from e
+
+        state_file.unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS(f"导入完成，新建 {created} 个用户，用时 {time.monotonic() - began:.1f} 秒"))
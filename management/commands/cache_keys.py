@@ -0,0 +1,64 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from ...utils.cache.analyzer import publishedHotKeys, scanKeys
+
+
+def _formatBytes(size: int) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return str(size)
+
+
+class Command(BaseCommand):
+    help = "分析缓存热点键与大键（SCAN + MEMORY USAGE，不阻塞 Redis）"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--match", default="*", help="SCAN 匹配模式，默认 *")
+        parser.add_argument("--count", type=int, default=500, help="每批 SCAN 的键数量")
+        parser.add_argument("--top", type=int, default=20, help="输出前 N 项")
+        parser.add_argument("--max-keys", type=int, default=None, help="最多检查的键数量")
+        parser.add_argument("--pause", type=float, default=0.0, help="每批之间休眠秒数")
+        parser.add_argument("--samples", type=int, default=None, help="MEMORY USAGE 采样元素数，默认使用服务端默认值")
+        parser.add_argument("--hot", action="store_true", help="只输出采样汇总的热点键（需开启 CACHE_KEY_SAMPLE_RATE）")
+        parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+
+    def handle(self, *args, **options):
+        top = options["top"]
+        report = {"hot": publishedHotKeys(top)}
+        if not options["hot"]:
+            report["scan"] = scanKeys(
+                match=options["match"],
+                count=options["count"],
+                top=top,
+                max_keys=options["max_keys"],
+                pause=options["pause"],
+                samples=options["samples"],
+            )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+
+        hot = report["hot"]
+        self.stdout.write(self.style.MIGRATE_HEADING("热点前缀（采样估算访问量）"))
+        for prefix, score in hot["prefixes"] or [("（无采样数据）", 0)]:
+            self.stdout.write(f"  {score:>12.0f}  {prefix}")
+        self.stdout.write(self.style.MIGRATE_HEADING("热点键（采样估算访问量）"))
+        for key, score in hot["keys"] or [("（无采样数据）", 0)]:
+            self.stdout.write(f"  {score:>12.0f}  {key}")
+
+        scan = report.get("scan")
+        if not scan:
+            return
+        self.stdout.write(self.style.MIGRATE_HEADING(f"键空间：{scan['scanned']} 个键，共 {_formatBytes(scan['total_bytes'])}"))
+        self.stdout.write(self.style.MIGRATE_HEADING("最大的键"))
+        for row in scan["largest"]:
+            self.stdout.write(f"  {_formatBytes(row['bytes']):>10}  {row['type']:<6} {row['serializer']:<7} {row['key']}")
+        for title, name in (("按前缀", "prefixes"), ("按序列化方式", "serializers"), ("按类型", "types")):
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            for row in scan[name]:
+                self.stdout.write(f"  {_formatBytes(row['bytes']):>10}  {row['keys']:>8} 个  {row['name']}")
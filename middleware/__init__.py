@@ -0,0 +1,25 @@
+from typing import TYPE_CHECKING
+
+from ..utils.lazy import lazyExports
+
+if TYPE_CHECKING:
+    from .profiling import RequestProfilingMiddleware, profileView, signProfileRequest
+    from .request_context import RequestContextMiddleware
+    from .session_batch import SessionBatchMiddleware
+
+
+__all__ = [
+    "RequestProfilingMiddleware",
+    "profileView",
+    "signProfileRequest",
+    "RequestContextMiddleware",
+    "SessionBatchMiddleware",
+]
+
+__getattr__, __dir__ = lazyExports(__name__, {
+    "RequestProfilingMiddleware": ".profiling",
+    "profileView": ".profiling",
+    "signProfileRequest": ".profiling",
+    "RequestContextMiddleware": ".request_context",
+    "SessionBatchMiddleware": ".session_batch",
+})
@@ -0,0 +1,293 @@
+"""
+按需单请求性能剖析中间件
+
+仅在开启 REQUEST_PROFILING_ENABLED 且请求被授权时剖析，其余请求不受影响：
+- 请求头 X-Profile 携带签名值（signProfileRequest 生成，有时效），适用于 JWT 等在视图内认证的接口
+- 或已登录的超级用户（需位于 AuthenticationMiddleware 之后）携带 X-Profile: 1 / memory
+
+剖析结果以“请求ID-随机后缀”命名保存在 REQUEST_PROFILING_DIR（重复的请求ID不会覆盖之前的结果）：
+    <id>.prof      cProfile 数据（python -m pstats / snakeviz 查看）
+    <id>.json      摘要：耗时、ORM 查询与缓存调用次数/耗时、最耗时函数、内存分配热点
+    <id>.snapshot  tracemalloc 快照（值为 memory 时）
+响应头 X-Profile-Id 返回剖析ID，通过 profileView 下载。
+
+生成签名值：
+    python manage.py shell -c "from <包名>.middleware.profiling import signProfileRequest; print(signProfileRequest())"
+
+settings:
+    REQUEST_PROFILING_ENABLED: 是否启用，默认 False（关闭时中间件不加载）
+    REQUEST_PROFILING_HEADER: 触发请求头，默认 "X-Profile"
+    REQUEST_PROFILING_DIR: 结果保存目录，默认 <临时目录>/request_profiles
+    REQUEST_PROFILING_MAX_AGE: 签名值有效期（秒），默认 3600
+    REQUEST_PROFILING_KEEP: 最多保留的剖析结果数，默认 100
+    REQUEST_PROFILING_ALLOW_SUPERUSER: 是否允许超级用户不签名直接触发，默认 True
+"""
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import tempfile
+import threading
+import tracemalloc
+import uuid
+from time import perf_counter
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from ..utils.context import getRequestId, getTimings, resetTimings, startTimings
+from .request_context import installDbTimer
+
+logger = logging.getLogger(__name__)
+
+SIGNING_SALT = "request_profiling"
+MODES = ("cpu", "memory")
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 20
+
+_PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+# cProfile 同一时刻只能有一个处于启用状态（3.12 起为进程级），并发的剖析请求直接跳过
+_lock = threading.Lock()
+
+
+def signProfileRequest(mode: str = "cpu") -> str:
+    """生成触发剖析的请求头签名值，mode 为 memory 时额外记录内存分配"""
+    if mode not in MODES:
+        raise ValueError(f"mode 必须为 {'/'.join(MODES)}")
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign(mode)
+
+
+def profilingDir() -> str:
+    return getattr(settings, "REQUEST_PROFILING_DIR", None) or os.path.join(tempfile.gettempdir(), "request_profiles")
+
+
+def requestedMode(request) -> Optional[str]:
+    """
+    解析请求的剖析模式
+    ===
+    :return: "cpu" / "memory"，未请求或未授权时返回 None
+    """
+    header = getattr(settings, "REQUEST_PROFILING_HEADER", "X-Profile")
+    value = request.META.get("HTTP_" + header.upper().replace("-", "_"))
+    if not value:
+        return None
+    try:
+        mode = signing.TimestampSigner(salt=SIGNING_SALT).unsign(
+            value, max_age=getattr(settings, "REQUEST_PROFILING_MAX_AGE", 3600)
+        )
+    except signing.BadSignature:
+        mode = None
+    if mode in MODES:
+        return mode
+    if getattr(settings, "REQUEST_PROFILING_ALLOW_SUPERUSER", True):
+        user = getattr(request, "user", None)
+        if user is not None and getattr(user, "is_superuser", False):
+            return "memory" if value == "memory" else "cpu"
+    logger.warning("剖析请求未授权：%s %s", request.method, request.path)
+    return None
+
+
+class RequestProfile:
+    """单次请求的剖析过程"""
+
+    def __init__(self, request, mode: str):
+        self.request = request
+        self.mode = mode
+        # 请求ID可由客户端指定，追加随机后缀避免覆盖已有的剖析结果
+        request_id = getattr(request, "request_id", None) or getRequestId()
+        suffix = uuid.uuid4().hex
+        self.profile_id = f"{re.sub(r'[^A-Za-z0-9_-]', '_', request_id)[:95]}-{suffix}" if request_id else suffix
+        self.profiler = cProfile.Profile()
+        self.trace_memory = mode == "memory" and not tracemalloc.is_tracing()
+        self.snapshot = None
+        self.timings_token = None
+        self.start = 0.0
+        self.duration = 0.0
+
+    def begin(self) -> None:
+        # 未安装 RequestContextMiddleware 时自行开启阶段统计，用于计数 ORM 查询与缓存调用
+        if getTimings() is None:
+            self.timings_token = startTimings()
+        # 导入本模块前已建立的连接补挂耗时统计
+        for connection in connections.all(initialized_only=True):
+            installDbTimer(None, connection)
+        if self.trace_memory:
+            tracemalloc.start(10)
+        self.start = perf_counter()
+        self.profiler.enable()
+
+    def end(self) -> dict:
+        self.profiler.disable()
+        self.duration = perf_counter() - self.start
+        try:
+            if self.mode == "memory" and tracemalloc.is_tracing():
+                self.snapshot = tracemalloc.take_snapshot()
+        finally:
+            # 快照失败时同样恢复 tracemalloc 与阶段统计
+            if self.trace_memory:
+                tracemalloc.stop()
+            timings = getTimings() or {}
+            if self.timings_token is not None:
+                resetTimings(self.timings_token)
+        return timings
+
+    def save(self, response, timings: dict) -> None:
+        directory = profilingDir()
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, self.profile_id)
+        self.profiler.dump_stats(base + ".prof")
+
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        summary = {
+            "profile_id": self.profile_id,
+            "method": self.request.method,
+            "path": self.request.path,
+            "status": response.status_code,
+            "duration_ms": round(self.duration * 1000, 3),
+            "queries": self._phase(timings, "db"),
+            "cache": self._phase(timings, "cache"),
+            "timings": {phase: self._phase(timings, phase) for phase in timings},
+            "functions": stream.getvalue(),
+        }
+        if self.snapshot is not None:
+            self.snapshot.dump(base + ".snapshot")
+            summary["allocations"] = [
+                {"location": str(stat.traceback), "size": stat.size, "count": stat.count}
+                for stat in self.snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+            ]
+        with open(base + ".json", "w", encoding="utf-8") as fp:
+            json.dump(summary, fp, ensure_ascii=False, indent=2)
+        _prune(directory, getattr(settings, "REQUEST_PROFILING_KEEP", 100))
+        logger.info(
+            "已剖析请求 %s %s（%.2fms，查询 %s 次，缓存调用 %s 次）：%s",
+            self.request.method, self.request.path, self.duration * 1000,
+            summary["queries"]["count"], summary["cache"]["count"], base,
+        )
+
+    @staticmethod
+    def _phase(timings: dict, phase: str) -> dict:
+        seconds, count = timings.get(phase, (0.0, 0))
+        return {"count": int(count), "duration_ms": round(seconds * 1000, 3)}
+
+
+def _prune(directory: str, keep: int) -> None:
+    """只保留最近 keep 次剖析结果"""
+    entries = [entry for entry in os.scandir(directory) if entry.name.endswith(".json")]
+    if len(entries) <= keep:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:len(entries) - keep]:
+        base = entry.path[:-len(".json")]
+        for suffix in (".json", ".prof", ".snapshot"):
+            try:
+                os.remove(base + suffix)
+            except FileNotFoundError:
+                pass
+
+
+class RequestProfilingMiddleware:
+    """
+    按需剖析中间件（同步/异步均可）
+
+    建议放在 RequestContextMiddleware 与 AuthenticationMiddleware 之后，以复用请求ID与超级用户判断。
+    异步视图的剖析结果会混入同一事件循环中的其他协程，仅供参考。
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = self._begin(request)
+        if profile is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            timings = self._end(profile)
+        return self._finish(profile, response, timings)
+
+    async def __acall__(self, request):
+        profile = self._begin(request)
+        if profile is None:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            timings = self._end(profile)
+        return self._finish(profile, response, timings)
+
+    def _begin(self, request) -> Optional[RequestProfile]:
+        mode = requestedMode(request)
+        if mode is None:
+            return None
+        if not _lock.acquire(blocking=False):
+            logger.warning("已有请求正在剖析，跳过 %s %s", request.method, request.path)
+            return None
+        profile = RequestProfile(request, mode)
+        try:
+            profile.begin()
+        except Exception:
+            _lock.release()
+            raise
+        return profile
+
+    @staticmethod
+    def _end(profile: RequestProfile) -> Optional[dict]:
+        """结束剖析并释放锁（结束失败时返回 None，锁同样释放）"""
+        try:
+            return profile.end()
+        except Exception:
+            logger.exception("结束剖析失败：%s", profile.profile_id)
+            return None
+        finally:
+            _lock.release()
+
+    def _finish(self, profile: RequestProfile, response, timings: Optional[dict]):
+        # 剖析失败不影响正常响应
+        if timings is None:
+            return response
+        try:
+            profile.save(response, timings)
+        except Exception:
+            logger.exception("保存剖析结果失败：%s", profile.profile_id)
+            return response
+        response["X-Profile-Id"] = profile.profile_id
+        return response
+
+
+def profileView(request, profile_id: str):
+    """
+    下载剖析结果（授权方式与触发剖析相同）
+    ===
+    ?artifact=json（默认，摘要）| prof | snapshot
+    """
+    from django.http import FileResponse, Http404, HttpResponseForbidden, JsonResponse
+
+    if requestedMode(request) is None:
+        return HttpResponseForbidden()
+    artifact = request.GET.get("artifact", "json")
+    if artifact not in ("json", "prof", "snapshot") or not _PROFILE_ID_PATTERN.match(profile_id):
+        raise Http404("profile not found")
+    path = os.path.join(profilingDir(), f"{profile_id}.{artifact}")
+    if not os.path.exists(path):
+        raise Http404("profile not found")
+    if artifact == "json":
+        with open(path, encoding="utf-8") as fp:
+            return JsonResponse(json.load(fp), json_dumps_params={"ensure_ascii": False})
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=os.path.basename(path))
@@ -0,0 +1,135 @@
+"""
+请求上下文中间件
+
+- 分配/透传请求ID（请求头 X-Request-ID），APIResponse 自动带上
+- 统计认证、数据库、缓存、渲染各阶段耗时，输出 Server-Timing 响应头与结构化日志
+"""
+import logging
+import re
+import uuid
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from ..utils.context import (
+    addTiming,
+    getTimings,
+    resetRequestId,
+    resetTimings,
+    setRequestId,
+    startTimings,
+)
+
+logger = logging.getLogger(__name__)
+
+# 透传的请求ID只接受安全字符，避免日志注入
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+def _dbTimer(execute, sql, params, many, context):
+    """数据库执行包装器：未处于请求上下文时直接执行"""
+    if getTimings() is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        addTiming("db", perf_counter() - start)
+
+
+@receiver(connection_created)
+def installDbTimer(sender, connection, **kwargs):
+    """
+    新建数据库连接时挂载耗时统计
+    ===
+    挂在连接上而不是请求内临时挂载，异步视图中 ORM 运行在线程池里同样能统计到
+    """
+    if _dbTimer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_dbTimer)
+
+
+class RequestContextMiddleware:
+    """
+    请求ID与耗时统计中间件（同步/异步均可）
+
+    settings:
+        REQUEST_ID_HEADER: 请求ID请求头/响应头名称，默认 "X-Request-ID"
+        SERVER_TIMING_ENABLED: 是否输出 Server-Timing 响应头，默认 True
+        REQUEST_LOG_ENABLED: 是否输出每个请求的结构化日志，默认 True
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.header = getattr(settings, "REQUEST_ID_HEADER", "X-Request-ID")
+        self.meta_key = "HTTP_" + self.header.upper().replace("-", "_")
+        self.server_timing = getattr(settings, "SERVER_TIMING_ENABLED", True)
+        self.log_enabled = getattr(settings, "REQUEST_LOG_ENABLED", True)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tokens = self._begin(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            timings = getTimings()
+            resetTimings(tokens[1])
+            resetRequestId(tokens[0])
+        return self._finish(request, response, timings, tokens[2])
+
+    async def __acall__(self, request):
+        tokens = self._begin(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            timings = getTimings()
+            resetTimings(tokens[1])
+            resetRequestId(tokens[0])
+        return self._finish(request, response, timings, tokens[2])
+
+    def _begin(self, request):
+        request_id = request.META.get(self.meta_key)
+        if not request_id or not _REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id
+        return setRequestId(request_id), startTimings(), perf_counter()
+
+    def _finish(self, request, response, timings, start):
+        total = perf_counter() - start
+        response[self.header] = request.request_id
+
+        if self.server_timing:
+            metrics = [
+                f'{phase};dur={seconds * 1000:.2f};desc="{int(count)}"'
+                for phase, (seconds, count) in timings.items()
+            ]
+            metrics.append(f"total;dur={total * 1000:.2f}")
+            response["Server-Timing"] = ", ".join(metrics)
+
+        if self.log_enabled and logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "%s %s %s %.2fms",
+                request.method,
+                request.path,
+                response.status_code,
+                total * 1000,
+                extra={
+                    "request_id": request.request_id,
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "duration_ms": round(total * 1000, 3),
+                    "timings": {
+                        phase: {"duration_ms": round(seconds * 1000, 3), "count": int(count)}
+                        for phase, (seconds, count) in timings.items()
+                    },
+                },
+            )
+        return response
@@ -0,0 +1,60 @@
+"""
+会话写入合并中间件
+
+请求期间 DataCache 的 saveData / updateData / deleteData 写入请求内缓冲，
+同一令牌的多次修改合并，在响应返回前通过一条流水线写入 Redis。
+"""
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from ..utils.cache.data_cache import DataCache
+
+logger = logging.getLogger(__name__)
+
+
+class SessionBatchMiddleware:
+    """
+    会话写入合并中间件（同步/异步均可）
+
+    响应状态码为 5xx 时视为请求失败，丢弃缓冲的写入（与数据库事务回滚的语义一致）
+    """
+    sync_capable = True
+    async_capable = True
+    cache = DataCache
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self.cache.startBatch()
+        batch = self.cache.getBatch()
+        try:
+            response = self.get_response(request)
+        finally:
+            self.cache.resetBatch(token)
+        self._finish(batch, response)
+        return response
+
+    async def __acall__(self, request):
+        token = self.cache.startBatch()
+        batch = self.cache.getBatch()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.cache.resetBatch(token)
+        # Redis 客户端为同步实现，写入放到线程池中执行，不阻塞事件循环
+        await sync_to_async(self._finish, thread_sensitive=False)(batch, response)
+        return response
+
+    def _finish(self, batch, response) -> None:
+        if response.status_code >= 500:
+            if len(batch):
+                logger.warning("请求失败（%s），丢弃 %s 个未写入的会话修改", response.status_code, len(batch))
+            batch.discard()
+            return
+        batch.flush()
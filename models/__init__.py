@@ -1,6 +1,16 @@
-from .base_model import BaseModel, BaseUser
+from typing import TYPE_CHECKING
+
+from ..utils.lazy import lazyExports
+
+if TYPE_CHECKING:
+    from .base_model import BaseModel, BaseUser
 
 
 __all__ = [
     "BaseModel"
 ]
+
+__getattr__, __dir__ = lazyExports(__name__, {
+    "BaseModel": ".base_model",
+    "BaseUser": ".base_model",
+})
@@ -1,8 +1,40 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
 from django.apps import apps
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.base_user import (
     BaseUserManager as DJ_BaseUserManager,
 )
+from django.db import transaction
+
+
+class BulkCreateUsersError(Exception):
+    """批量创建用户失败，processed 为已成功写入（含跳过部分）的行数，可作为续传起点"""
+
+    def __init__(self, message: str, processed: int):
+        self.processed = processed
+        super().__init__(message)
+
+
+def _initHashWorker():
+    """
+    进程池初始化：spawn 方式启动的子进程需要重新加载 Django 配置
+    （依赖 DJANGO_SETTINGS_MODULE 环境变量；fork 方式下为空操作）
+    """
+    import django
+    django.setup()
+
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
 
 class BaseUserManager(DJ_BaseUserManager):
@@ -13,7 +45,7 @@ class BaseUserManager(DJ_BaseUserManager):
         if not username:
             raise ValueError("The given username must be set")
 
-        user = self.model(username=username ** extra_fields)
+        user = self.model(username=username, **extra_fields)
         user.password = make_password(password)
         user.save(using=self._db)
         return user
@@ -31,3 +63,72 @@ class BaseUserManager(DJ_BaseUserManager):
             raise ValueError("Superuser must have is_superuser=True.")
 
         return self._create_user(username, password, **extra_fields)
+
+    def bulk_create_users(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        batch_size: int = 1000,
+        workers: Optional[int] = None,
+        start: int = 0,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """
+        批量创建用户
+        ===
+        密码哈希（PBKDF2 等）在进程池中并行计算，当前批次写库的同时下一批次已在哈希；
+        每个批次单独事务 bulk_create，失败时抛出 BulkCreateUsersError 携带续传位置。
+
+        Args:
+            rows: 用户数据（可为生成器，流式读取），每行需包含 username，password 可选
+            batch_size: 每批次行数
+            workers: 哈希进程数，默认 CPU 核数
+            start: 跳过前 start 行（断点续传）
+            progress: 每批次写入后回调，参数为已处理的总行数（含跳过部分）
+        Returns:
+            本次新建的用户数量
+        """
+        processed = start
+        rows = islice(rows, start, None)
+        workers = workers or os.cpu_count() or 1
+
+        def build(chunk, hashed):
+            users = []
+            for row, password in zip(chunk, hashed):
+                fields = dict(row)
+                username = fields.pop("username", None)
+                fields.pop("password", None)
+                if not username:
+                    raise ValueError("The given username must be set")
+                fields.setdefault("is_superuser", False)
+                user = self.model(username=username, **fields)
+                user.password = password
+                users.append(user)
+            return users
+
+        def insert(chunk, hashed):
+            nonlocal processed
+            with transaction.atomic(using=self._db):
+                self.bulk_create(build(chunk, hashed), batch_size=batch_size)
+            processed += len(chunk)
+            if progress is not None:
+                progress(processed)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initHashWorker) as executor:
+            pending = None
+            try:
+                for chunk in _chunks(rows, batch_size):
+                    # executor.map 立即提交任务：先提交本批次哈希，再写入上一批次
+                    hashed = executor.map(
+                        make_password,
+                        [row.get("password") for row in chunk],
+                        chunksize=max(1, len(chunk) // (workers * 4)),
+                    )
+                    if pending is not None:
+                        insert(*pending)
+                    pending = (chunk, hashed)
+                if pending is not None:
+                    insert(*pending)
+            except Exception as e:
+                raise BulkCreateUsersError(f"批量创建用户失败（已处理 {processed} 行）：{e}", processed) from e
+
+        return processed - start
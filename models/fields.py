@@ -1,18 +1,35 @@
 import logging
+from functools import lru_cache
+from typing import TYPE_CHECKING
 from django.db import models
-from ..utils.crypto.aes import AESHandler
+
+if TYPE_CHECKING:
+    from ..utils.crypto.aes import AESHandler
 
 AES_KEY = "ojbkmmpcode2025^"
-encryptor = AESHandler(AES_KEY)
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def getEncryptor() -> "AESHandler":
+    """加密器（首次使用时创建，导入本模块不加载加密库）"""
+    from ..utils.crypto.aes import AESHandler
+    return AESHandler(AES_KEY)
+
+
+def __getattr__(name: str):
+    # 兼容旧用法 from .fields import encryptor
+    if name == "encryptor":
+        return getEncryptor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 class EncryptedField(models.TextField):
     def from_db_value(self, value, expression, connection):
         """从数据库读取时解密"""
         try:
-            return encryptor.decrypt(value)
+            return getEncryptor().decrypt(value)
         except Exception as e:
             logger.error(f"数据库=>模型: 解密失败：{str(e)}")
             return value
@@ -24,7 +41,7 @@ class EncryptedField(models.TextField):
 
         value = super().to_python(value)
         try:
-            return encryptor.decrypt(value)
+            return getEncryptor().decrypt(value)
         except Exception as e:
             # 如果解密失败，说明 value 可能已经是明文，直接返回
             logger.error("Value=>Python: value已经是明文，无需转换")
@@ -37,13 +54,13 @@ class EncryptedField(models.TextField):
         value = super().get_prep_value(value)
         try:
             # 尝试解密，如果成功，说明它已经是加密过的，直接返回
-            encryptor.decrypt(value)
+            getEncryptor().decrypt(value)
             logger.error("模型=>数据库: value已经是加密过的，无需转换")
             return value
         except Exception:
             # 如果解密失败，说明是明文，进行加密
 
-            return encryptor.encrypt(value)
+            return getEncryptor().encrypt(value)
 
     def validate(self, value, model_instance):
         return super().validate(value, model_instance)
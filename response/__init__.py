@@ -1,16 +1,45 @@
-from .response import (
-    successResponse,
-    errorResponse,
-    pageResponse,
-    Response,
-)
-from .status import CommonStatus
+from typing import TYPE_CHECKING
+
+from ..utils.lazy import lazyExports
+
+if TYPE_CHECKING:
+    from .response import (
+        successResponse,
+        errorResponse,
+        pageResponse,
+        Response,
+        FastResponse,
+    )
+    from .renderers import APIJSONRenderer
+    from .streaming import streamResponse
+    from .status import CommonStatus
+    from .cache import cacheResponse, CacheResponseMixin, invalidateTags
 
 
 __all__ = [
     "successResponse",
     "errorResponse",
     "pageResponse",
+    "streamResponse",
     "Response",
+    "FastResponse",
+    "APIJSONRenderer",
     "CommonStatus",
+    "cacheResponse",
+    "CacheResponseMixin",
+    "invalidateTags",
 ]
+
+__getattr__, __dir__ = lazyExports(__name__, {
+    "successResponse": ".response",
+    "errorResponse": ".response",
+    "pageResponse": ".response",
+    "Response": ".response",
+    "FastResponse": ".response",
+    "APIJSONRenderer": ".renderers",
+    "streamResponse": ".streaming",
+    "CommonStatus": ".status",
+    "cacheResponse": ".cache",
+    "CacheResponseMixin": ".cache",
+    "invalidateTags": ".cache",
+})
@@ -0,0 +1,391 @@
+"""
+响应缓存
+
+GET/HEAD 接口的完整渲染结果缓存在 CommCache 中：
+- 缓存键由路径、查询参数、指定请求头和用户范围生成
+- 信封中的 timestamp / request_id 每次请求都会变化，缓存时剔除为占位，命中时填入当前值
+- ETag 为剔除动态字段后的内容哈希（弱 ETag），If-None-Match 命中时直接返回 304，不执行视图
+- 按标签失效：模型保存/删除（事务提交后）时删除关联标签下的全部缓存
+
+用法：
+    @cacheResponse(timeout=300, models=(Article,))
+    def articleList(request): ...
+
+    class ArticleView(CacheResponseMixin, APIView):
+        cache_timeout = 300
+        cache_models = (Article,)
+
+settings:
+    RESPONSE_CACHE_ENABLED: 全局开关，默认 True
+    RESPONSE_CACHE_TAG_TTL: 标签索引的最短保留时间（秒），默认 1 天
+"""
+import hashlib
+import json
+import logging
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, urlencode
+
+from ..utils.cache.redis import CommCache
+from ..utils.context import getRequestId
+from .response import currentTimestamp
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "response_cache"
+
+# 信封中每次请求都会变化的字段（顺序与 APIResponse.result 一致）
+DYNAMIC_FIELDS = ("timestamp", "request_id")
+
+# 不随缓存保存的响应头（由服务器或本模块重新生成；Vary 单独保存，命中时合并回响应）
+_SKIP_HEADERS = {"content-length", "set-cookie", "etag", "x-cache", "vary"}
+
+
+def tagIndexKey(tag: str) -> str:
+    """标签索引键（SET，成员为该标签下的缓存键）"""
+    return f"{KEY_PREFIX}:tag:{tag}"
+
+
+def modelTag(model) -> str:
+    """模型对应的标签，如 "app.article" """
+    return model._meta.label_lower
+
+
+def _encode(value: str) -> bytes:
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def splitTemplate(content: bytes, meta: Optional[Dict[str, Optional[str]]]) -> Tuple[List[bytes], List[str]]:
+    """
+    剔除信封中的动态字段
+    ===
+    信封字段位于 results 之后，取最后一处匹配，避免与数据中的同名字段混淆
+    Returns:
+        (静态片段, 片段之间的动态字段名)，len(parts) == len(slots) + 1
+    """
+    spans = []
+    for field in DYNAMIC_FIELDS:
+        value = (meta or {}).get(field)
+        if not value:
+            continue
+        pattern = re.compile(rb'"' + field.encode() + rb'":\s*(' + re.escape(_encode(value)) + rb")")
+        match = None
+        for match in pattern.finditer(content):
+            pass
+        if match is not None:
+            spans.append((match.start(1), match.end(1), field))
+    spans.sort()
+
+    parts, slots, position = [], [], 0
+    for start, end, field in spans:
+        parts.append(content[position:start])
+        slots.append(field)
+        position = end
+    parts.append(content[position:])
+    return parts, slots
+
+
+def fillTemplate(parts: Sequence[bytes], slots: Sequence[str]) -> bytes:
+    """用当前请求的 timestamp / request_id 填充占位"""
+    values = {"timestamp": currentTimestamp(), "request_id": getRequestId() or ""}
+    chunks = [parts[0]]
+    for field, part in zip(slots, parts[1:]):
+        chunks.append(_encode(values[field]))
+        chunks.append(part)
+    return b"".join(chunks)
+
+
+def computeETag(parts: Sequence[bytes]) -> str:
+    """内容哈希（不含动态字段），内容语义相同即可复用，故为弱 ETag"""
+    digest = hashlib.blake2b(b"\0".join(parts), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etagMatches(request, etag: str) -> bool:
+    """If-None-Match 弱比较"""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    if "*" in etags:
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any((tag[2:] if tag.startswith("W/") else tag) == opaque for tag in etags)
+
+
+def invalidateTags(*tags: str) -> int:
+    """
+    删除标签下的全部缓存
+    :return: 删除的缓存键数量
+    """
+    pipe = ResponseCache.pipeline(transaction=False)
+    for tag in tags:
+        pipe.smembers(tagIndexKey(tag))
+    keys = {tagIndexKey(tag) for tag in tags}
+    for members in pipe.execute():
+        keys.update(key.decode("utf-8") if isinstance(key, bytes) else key for key in members)
+    deleted = ResponseCache.deleteMany(keys)
+    logger.debug("响应缓存失效：标签 %s，删除 %s 个键", ", ".join(tags), deleted)
+    return deleted
+
+
+def _invalidateSafely(tag: str) -> None:
+    """模型变更触发的失效：缓存不可用时只记录日志，不影响已提交的保存/删除"""
+    try:
+        invalidateTags(tag)
+    except Exception:
+        logger.exception("响应缓存失效失败（标签 %s），缓存将在过期后更新", tag)
+
+
+def _onModelChange(sender, **kwargs) -> None:
+    tag = modelTag(sender)
+    # 事务提交后再失效，避免并发请求在提交前读到旧数据并重新写入缓存
+    transaction.on_commit(lambda: _invalidateSafely(tag), using=kwargs.get("using"))
+
+
+def invalidateOn(*models) -> None:
+    """模型保存/删除时失效对应标签（重复调用只注册一次）"""
+    for model in models:
+        uid = f"{KEY_PREFIX}:{modelTag(model)}"
+        post_save.connect(_onModelChange, sender=model, dispatch_uid=uid, weak=False)
+        post_delete.connect(_onModelChange, sender=model, dispatch_uid=uid, weak=False)
+
+
+class ResponseCache(CommCache):
+    """
+    响应缓存策略
+    ===
+    Args:
+        timeout: 缓存时间（秒）
+        tags: 失效标签
+        models: 关联模型，保存/删除时自动失效（标签为模型的 label_lower）
+        vary_headers: 参与缓存键的请求头（同时写入响应的 Vary）
+        scope: "user" 按用户隔离（默认）；"global" 所有用户共享；
+               也可为 callable(request) -> str
+        key_prefix: 缓存键前缀，默认为视图的模块与名称
+    """
+    metrics_prefix = KEY_PREFIX
+    # 标签失效由其他进程执行时无法感知，熔断期间不从进程内回退缓存返回可能已失效的响应
+    local_fallback = False
+
+    def __init__(
+        self,
+        timeout: int = 60,
+        tags: Iterable[str] = (),
+        models: Iterable[Any] = (),
+        vary_headers: Iterable[str] = (),
+        scope: Union[str, Callable[[Any], str]] = "user",
+        key_prefix: Optional[str] = None,
+    ):
+        models = tuple(models)
+        self.timeout = timeout
+        self.tags = tuple(tags) + tuple(modelTag(model) for model in models)
+        self.vary_headers = tuple(vary_headers)
+        self.scope = scope
+        self.key_prefix = key_prefix or "view"
+        if models:
+            invalidateOn(*models)
+
+    @staticmethod
+    def enabled() -> bool:
+        return getattr(settings, "RESPONSE_CACHE_ENABLED", True)
+
+    def userScope(self, request) -> str:
+        """
+        用户范围
+        ===
+        已认证用户按主键隔离；未经中间件认证但携带 Authorization 的请求按令牌哈希隔离，
+        保证不同令牌之间永远不会共享缓存
+        """
+        if callable(self.scope):
+            return str(self.scope(request))
+        if self.scope == "global":
+            return "global"
+        user = getattr(request, "user", None)
+        if user is not None and getattr(user, "is_authenticated", False):
+            return f"u{user.pk}"
+        authorization = request.headers.get("Authorization")
+        if authorization:
+            return "t" + hashlib.sha256(authorization.encode("utf-8")).hexdigest()[:32]
+        return "anon"
+
+    def cacheKey(self, request) -> str:
+        query = urlencode(sorted(request.GET.lists()), doseq=True)
+        headers = [request.headers.get(name, "") for name in self.vary_headers]
+        raw = "\n".join([request.path, query, *headers, self.userScope(request)])
+        digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{KEY_PREFIX}:{self.key_prefix}:{digest}"
+
+    def lookup(self, request) -> Tuple[Optional[str], Optional[dict]]:
+        """返回 (缓存键, 缓存条目)；非 GET/HEAD 或未开启时均为 None"""
+        if request.method not in ("GET", "HEAD") or not self.enabled():
+            return None, None
+        cache_key = self.cacheKey(request)
+        try:
+            return cache_key, self.get(cache_key, pick_ser=True)
+        except Exception as e:
+            # 缓存不可用时退化为直接执行视图
+            logger.warning("读取响应缓存失败：%s", e)
+            return None, None
+
+    def build(self, request, entry: dict, response: Optional[HttpResponse] = None) -> HttpResponse:
+        """
+        补充 ETag 等响应头；response 为空时由缓存条目构建（命中）。
+        If-None-Match 匹配时返回 304
+        """
+        hit = response is None
+        if etagMatches(request, entry["etag"]):
+            response = HttpResponseNotModified()
+        elif hit:
+            response = HttpResponse(
+                fillTemplate(entry["parts"], entry["slots"]),
+                status=entry["status"],
+            )
+            for header, value in entry["headers"]:
+                response[header] = value
+        response["ETag"] = entry["etag"]
+        response["X-Cache"] = "HIT" if hit else "MISS"
+        # 还原原始响应的 Vary（如 DRF 的 Accept、上游中间件设置的头），304 同样需要
+        vary = tuple(entry.get("vary", ())) + self.vary_headers
+        if vary:
+            patch_vary_headers(response, vary)
+        return response
+
+    def cacheable(self, response) -> bool:
+        return (
+            response.status_code == 200
+            and not getattr(response, "streaming", False)
+            and not response.cookies
+            and "no-store" not in response.get("Cache-Control", "")
+            and "private" not in response.get("Cache-Control", "")
+        )
+
+    def store(self, cache_key: str, response) -> Optional[dict]:
+        """缓存响应，返回缓存条目（不可缓存时返回 None）"""
+        if hasattr(response, "render") and not getattr(response, "is_rendered", True):
+            # DRF Response / TemplateResponse 需先渲染
+            response.render()
+        if not self.cacheable(response):
+            return None
+        parts, slots = splitTemplate(response.content, getattr(response, "envelope_meta", None))
+        entry = {
+            "status": response.status_code,
+            "headers": [(header, value) for header, value in response.items() if header.lower() not in _SKIP_HEADERS],
+            "vary": [value.strip() for value in response.get("Vary", "").split(",") if value.strip()],
+            "parts": parts,
+            "slots": slots,
+            "etag": computeETag(parts),
+        }
+        try:
+            pipe = self.pipeline(transaction=False)
+            pipe.set(cache_key, self.dataProcess(entry, pick_ser=True, method="dumps"), ex=self.timeout)
+            tag_ttl = max(self.timeout, getattr(settings, "RESPONSE_CACHE_TAG_TTL", 60 * 60 * 24))
+            for tag in self.tags:
+                pipe.sadd(tagIndexKey(tag), cache_key)
+                pipe.expire(tagIndexKey(tag), tag_ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.warning("写入响应缓存失败：%s", e)
+        return entry
+
+    def handle(self, request, call: Callable[[], Any]):
+        cache_key, entry = self.lookup(request)
+        if entry is not None:
+            return self.build(request, entry)
+        response = call()
+        if cache_key is None:
+            return response
+        entry = self.store(cache_key, response)
+        if entry is None:
+            return response
+        return self.build(request, entry, response)
+
+    async def ahandle(self, request, call: Callable[[], Any]):
+        cache_key, entry = await sync_to_async(self.lookup, thread_sensitive=False)(request)
+        if entry is not None:
+            return self.build(request, entry)
+        response = await call()
+        if cache_key is None:
+            return response
+        entry = await sync_to_async(self.store, thread_sensitive=False)(cache_key, response)
+        if entry is None:
+            return response
+        return self.build(request, entry, response)
+
+
+def cacheResponse(
+    timeout: int = 60,
+    tags: Iterable[str] = (),
+    models: Iterable[Any] = (),
+    vary_headers: Iterable[str] = (),
+    scope: Union[str, Callable[[Any], str]] = "user",
+    key_prefix: Optional[str] = None,
+):
+    """
+    视图缓存装饰器（函数视图，同步/异步均可），参数见 ResponseCache
+    """
+    def decorator(view):
+        cache = ResponseCache(
+            timeout=timeout,
+            tags=tags,
+            models=models,
+            vary_headers=vary_headers,
+            scope=scope,
+            key_prefix=key_prefix or f"{view.__module__}.{view.__qualname__}",
+        )
+
+        if iscoroutinefunction(view):
+            async def wrapper(request, *args, **kwargs):
+                return await cache.ahandle(request, lambda: view(request, *args, **kwargs))
+            markcoroutinefunction(wrapper)
+        else:
+            def wrapper(request, *args, **kwargs):
+                return cache.handle(request, lambda: view(request, *args, **kwargs))
+
+        wrapper.__name__ = view.__name__
+        wrapper.__qualname__ = view.__qualname__
+        wrapper.__module__ = view.__module__
+        wrapper.__doc__ = view.__doc__
+        wrapper.response_cache = cache
+        return wrapper
+
+    return decorator
+
+
+class CacheResponseMixin:
+    """
+    类视图缓存（Django View / DRF APIView），包裹 dispatch
+
+    dispatch 早于 DRF 认证执行，按用户隔离依赖认证中间件设置的 request.user
+    （如 JWTAuthenticationMiddleware），否则按 Authorization 请求头隔离
+    """
+    cache_timeout = 60
+    cache_tags: Sequence[str] = ()
+    cache_models: Sequence[Any] = ()
+    cache_vary_headers: Sequence[str] = ()
+    cache_scope: Union[str, Callable[[Any], str]] = "user"
+
+    @classmethod
+    def getResponseCache(cls) -> ResponseCache:
+        cache = cls.__dict__.get("_response_cache")
+        if cache is None:
+            cache = ResponseCache(
+                timeout=cls.cache_timeout,
+                tags=cls.cache_tags,
+                models=cls.cache_models,
+                vary_headers=cls.cache_vary_headers,
+                scope=cls.cache_scope,
+                key_prefix=f"{cls.__module__}.{cls.__qualname__}",
+            )
+            cls._response_cache = cache
+        return cache
+
+    def dispatch(self, request, *args, **kwargs):
+        return self.getResponseCache().handle(request, lambda: super(CacheResponseMixin, self).dispatch(request, *args, **kwargs))
@@ -0,0 +1,124 @@
+"""
+高性能 JSON 渲染模块
+
+优先使用 orjson（原生支持 UUID/dataclass，直接输出 UTF-8 字节），
+未安装时回退到标准库 json + DjangoJSONEncoder，输出格式保持一致。
+datetime/date/time 交给 DjangoJSONEncoder 编码（毫秒精度、UTC 输出为 Z），与标准渲染器逐字节一致。
+"""
+import datetime
+import decimal
+import json
+from functools import lru_cache
+from typing import Any, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.duration import duration_iso_string
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer
+
+from .status import BaseStatusCode
+from ..utils.context import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+_encoder = DjangoJSONEncoder()
+
+
+def _default(obj: Any) -> Any:
+    """orjson 无法原生处理的类型，与 DjangoJSONEncoder 的输出保持一致"""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, datetime.timedelta):
+        return duration_iso_string(obj)
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "tolist"):
+        # numpy 等数组类型
+        return obj.tolist()
+    return _encoder.default(obj)
+
+
+if orjson is not None:
+    _ORJSON_OPTION = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(obj: Any) -> bytes:
+        """序列化为 JSON 字节（orjson）"""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTION)
+else:
+    def dumps(obj: Any) -> bytes:
+        """序列化为 JSON 字节（标准库回退）"""
+        return json.dumps(
+            obj, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+# 信封自带字段，extra 中出现时按 dict.update 语义覆盖
+_ENVELOPE_KEYS = frozenset({"code", "msg", "results", "timestamp", "request_id"})
+
+
+@lru_cache(maxsize=1024)
+def _envelopePrefix(code: int, msg: str) -> bytes:
+    """缓存 `{"code":...,"msg":...,"results":` 前缀，相同状态码/信息无需重复编码"""
+    return b'{"code":' + str(code).encode() + b',"msg":' + dumps(msg) + b',"results":'
+
+
+def renderEnvelope(
+    code: BaseStatusCode,
+    msg: str,
+    data: Any = None,
+    timestamp: Optional[str] = None,
+    request_id: Optional[str] = None,
+    extra: Optional[dict] = None,
+) -> bytes:
+    """
+    直接拼接响应信封字节，不构建中间 result 字典
+    ===
+    输出字段顺序与 APIResponse.result 一致：code, msg, results, timestamp, request_id, **extra
+    extra 中含信封字段时回退为构建字典，保证覆盖语义与 APIResponse.result 相同
+    """
+    if extra and not _ENVELOPE_KEYS.isdisjoint(extra):
+        result = {"code": code.code, "msg": msg, "results": data}
+        if timestamp is not None:
+            result["timestamp"] = timestamp
+        if request_id:
+            result["request_id"] = request_id
+        result.update(extra)
+        return dumps(result)
+    if msg == code.message:
+        prefix = code.envelopePrefix
+    else:
+        prefix = _envelopePrefix(code.code, msg)
+    parts = [prefix, dumps(data)]
+    if timestamp is not None:
+        parts.append(b',"timestamp":')
+        parts.append(dumps(timestamp))
+    if request_id:
+        parts.append(b',"request_id":')
+        parts.append(dumps(request_id))
+    if extra:
+        for key, value in extra.items():
+            parts.append(b"," + dumps(str(key)) + b":" + dumps(value))
+    parts.append(b"}")
+    return b"".join(parts)
+
+
+class APIJSONRenderer(BaseRenderer):
+    """
+    DRF 渲染器，普通视图返回的 rest_framework.response.Response 同样走快速编码
+
+    settings.REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] 中替换 JSONRenderer 即可。
+    """
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    @timed("render")
+    def render(self, data: Any, accepted_media_type: Optional[str] = None, renderer_context: Optional[dict] = None) -> bytes:
+        if data is None:
+            return b""
+        return dumps(data)
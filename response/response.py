@@ -1,7 +1,11 @@
 import datetime
+import time
 from typing import Any, Optional, Dict, List
 from .status import BaseStatusCode, CommonStatus
-from django.http import JsonResponse
+from .renderers import renderEnvelope
+from ..utils.context import getRequestId, timed, timing
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.core.paginator import Page, Paginator
 
 
@@ -9,6 +13,29 @@ class Response(JsonResponse):
     ...
 
 
+class FastResponse(HttpResponse):
+    """已编码好的 JSON 字节响应（配合 renderEnvelope 使用）"""
+
+    def __init__(self, content: bytes = b"", **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=content, **kwargs)
+
+
+# 时间戳按秒缓存，同一秒内的响应复用格式化结果
+_timestamp_cache = (0, "")
+
+
+def currentTimestamp() -> str:
+    """当前时间字符串（%Y-%m-%d %H:%M:%S），每秒只格式化一次"""
+    global _timestamp_cache
+    now = int(time.time())
+    cached_at, value = _timestamp_cache
+    if cached_at != now:
+        value = datetime.datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+        _timestamp_cache = (now, value)
+    return value
+
+
 class APIResponse:
     """统一API响应类"""
 
@@ -35,8 +62,9 @@ class APIResponse:
         self.code = code
         self.msg = msg or code.message
         self.data = data
-        self.timestamp = timestamp or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.request_id = request_id
+        self.timestamp = timestamp or currentTimestamp()
+        # 未显式传入时使用 RequestContextMiddleware 分配的请求ID
+        self.request_id = request_id or getRequestId()
         self.extra = kwargs
 
         # self.data["time"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -62,17 +90,43 @@ class APIResponse:
 
     def toJsonResponse(self):
         """转换为JsonResponse"""
+        # 开启 FAST_JSON_RESPONSE 时走快速渲染
+        if getattr(settings, "FAST_JSON_RESPONSE", False):
+            return self.toFastJsonResponse()
+
         # 设置HTTP状态码
         status = self.code.code
 
         # 创建响应
-        response = Response(
-            self.result,
-            status=status,
-            json_dumps_params={"ensure_ascii": False}
+        with timing("render"):
+            response = Response(
+                self.result,
+                status=status,
+                json_dumps_params={"ensure_ascii": False}
+            )
+        response.envelope_meta = self.envelopeMeta
+        return response
+
+    @timed("render")
+    def toFastJsonResponse(self) -> FastResponse:
+        """直接渲染为 JSON 字节响应（orjson 优先，不构建中间字典）"""
+        content = renderEnvelope(
+            self.code,
+            self.msg,
+            self.data,
+            timestamp=self.timestamp,
+            request_id=self.request_id,
+            extra=self.extra,
         )
+        response = FastResponse(content, status=self.code.code)
+        response.envelope_meta = self.envelopeMeta
         return response
 
+    @property
+    def envelopeMeta(self) -> Dict[str, Optional[str]]:
+        """每次请求都会变化的信封字段，响应缓存据此剔除后计算 ETag、命中时重新填充"""
+        return {"timestamp": self.timestamp, "request_id": self.request_id}
+
 
 class ResponseUtil:
     """响应工具类"""
@@ -1,19 +1,47 @@
-from enum import Enum
+import json
+from enum import Enum, EnumMeta
 
 
-class BaseStatusCode(Enum):
+class StatusCodeMeta(EnumMeta):
+    """
+    状态码元类
+    ===
+    类创建时构建 code => 成员 的索引，并在导入阶段检查重复的 code
+    """
+
+    def __new__(metacls, cls, bases, classdict, **kwds):
+        enum_class = super().__new__(metacls, cls, bases, classdict, **kwds)
+        index = {}
+        for name, member in enum_class.__members__.items():
+            # (code, message) 完全相同时 Enum 会生成别名，同样视为重复
+            if member.name != name:
+                raise ValueError(f"{enum_class.__name__}: 状态码 {name} 与 {member.name} 重复（code={member.code}）")
+            existing = index.get(member.code)
+            if existing is not None:
+                raise ValueError(f"{enum_class.__name__}: 状态码 {name} 与 {existing.name} 重复（code={member.code}）")
+            index[member.code] = member
+        enum_class._code_index_ = index
+        return enum_class
+
+
+class BaseStatusCode(Enum, metaclass=StatusCodeMeta):
     """状态码基类"""
 
     def __init__(self, code: int, message: str):
         self.code = code
         self.message = message
+        # 预编码的信封前缀：{"code":...,"msg":"...","results":，使用默认信息时直接复用
+        self.envelopePrefix = (
+            b'{"code":' + str(code).encode() + b',"msg":'
+            + json.dumps(message, ensure_ascii=False).encode("utf-8") + b',"results":'
+        )
 
     @classmethod
     def getByCode(cls, code: int, default=None):
         """通过 code 获取枚举成员"""
-        for member in cls:
-            if member.code == code:
-                return member
+        member = cls._code_index_.get(code)
+        if member is not None:
+            return member
         if default is None:
             raise ValueError(f"No matching member found with code {code}")
         return default
@@ -27,6 +55,9 @@ class CommonStatus(BaseStatusCode):
     UNAUTHORIZED = (401, "未授权访问")
     FORBIDDEN = (403, "禁止访问")
     NOT_FOUND = (404, "资源不存在")
+    METHOD_NOT_ALLOWED = (405, "请求方法不允许")
+    NOT_ACCEPTABLE = (406, "无法满足请求的响应格式")
+    UNSUPPORTED_MEDIA_TYPE = (415, "不支持的媒体类型")
     INTERNAL_SERVER_ERROR = (500, "服务器内部错误")
 
     # 业务相关状态码 (可根据需要扩展)
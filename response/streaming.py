@@ -0,0 +1,123 @@
+"""
+流式响应模块
+
+大结果集（导出类接口）逐行序列化输出，内存占用与行数无关。
+"""
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from django.http import StreamingHttpResponse
+
+from ..utils.context import getRequestId
+from .renderers import dumps, renderEnvelope
+from .response import currentTimestamp
+from .status import BaseStatusCode, CommonStatus
+
+# 每次向下游写出的行数（同时用作 QuerySet.iterator 的 chunk_size）
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def iterRows(source: Iterable[Any], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    遍历数据源
+    ===
+    QuerySet 使用 iterator(chunk_size=...) 避免结果缓存，其余可迭代对象直接遍历
+    """
+    iterator = getattr(source, "iterator", None)
+    if callable(iterator):
+        return iterator(chunk_size=chunk_size)
+    return iter(source)
+
+
+def _iterJson(
+    rows: Iterator[Any],
+    serializer: Optional[Callable[[Any], Any]],
+    head: bytes,
+    tail: bytes,
+    chunk_size: int,
+) -> Iterator[bytes]:
+    """输出 head + [row, row, ...] + tail，按 chunk_size 行合并为一个块"""
+    yield head + b"["
+    buffer = []
+    first = True
+    for row in rows:
+        if serializer is not None:
+            row = serializer(row)
+        if first:
+            buffer.append(dumps(row))
+            first = False
+        else:
+            buffer.append(b"," + dumps(row))
+        if len(buffer) >= chunk_size:
+            yield b"".join(buffer)
+            buffer.clear()
+    if buffer:
+        yield b"".join(buffer)
+    yield b"]" + tail
+
+
+def _iterNdjson(
+    rows: Iterator[Any],
+    serializer: Optional[Callable[[Any], Any]],
+    head: bytes,
+    chunk_size: int,
+) -> Iterator[bytes]:
+    """首行为信封（results 为 null），其后每行一条数据"""
+    yield head + b"\n"
+    buffer = []
+    for row in rows:
+        if serializer is not None:
+            row = serializer(row)
+        buffer.append(dumps(row) + b"\n")
+        if len(buffer) >= chunk_size:
+            yield b"".join(buffer)
+            buffer.clear()
+    if buffer:
+        yield b"".join(buffer)
+
+
+def streamResponse(
+    source: Iterable[Any],
+    serializer: Optional[Callable[[Any], Any]] = None,
+    message: str = "获取成功",
+    code: BaseStatusCode = CommonStatus.SUCCESS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ndjson: bool = False,
+    request_id: Optional[str] = None,
+    **kwargs
+) -> StreamingHttpResponse:
+    """
+    流式响应快捷方法
+    ===
+    Args:
+        source: QuerySet、生成器或任意可迭代对象
+        serializer: 单行序列化函数（如 lambda obj: MySerializer(obj).data），为空时原样输出
+        message: 状态信息
+        code: 状态码枚举
+        chunk_size: 每次读取/写出的行数
+        ndjson: 是否输出 NDJSON（application/x-ndjson）
+        request_id: 请求ID，为空时取当前请求上下文中的请求ID
+        **kwargs: 附加到信封中的额外字段
+    """
+    timestamp = currentTimestamp()
+    request_id = request_id or getRequestId()
+    rows = iterRows(source, chunk_size)
+    # results 由流式输出的行填充，不允许通过 kwargs 覆盖
+    kwargs.pop("results", None)
+
+    if ndjson:
+        head = renderEnvelope(code, message, None, timestamp=timestamp, request_id=request_id, extra=kwargs)
+        return StreamingHttpResponse(
+            _iterNdjson(rows, serializer, head, chunk_size),
+            status=code.code,
+            content_type="application/x-ndjson",
+        )
+
+    # 先渲染一个 results 为 null 的信封，再从 null 处切开，保证字段顺序与 APIResponse 一致
+    envelope = renderEnvelope(code, message, None, timestamp=timestamp, request_id=request_id, extra=kwargs)
+    split_at = envelope.index(b'"results":null') + len(b'"results":')
+    head, tail = envelope[:split_at], envelope[split_at + len(b"null"):]
+    return StreamingHttpResponse(
+        _iterJson(rows, serializer, head, tail, chunk_size),
+        status=code.code,
+        content_type="application/json",
+    )
@@ -0,0 +1,51 @@
+"""
+cache_keys 管理命令
+
+python -m unittest <包名>.tests.test_cache_keys（需安装 fakeredis 或设置 BENCH_REDIS_URL）
+"""
+import io
+import json
+import unittest
+
+from ..benchmarks.bootstrap import configure, redisOptions
+
+
+@unittest.skipUnless(redisOptions(), "需要 fakeredis 或 BENCH_REDIS_URL")
+class CacheKeysCommandTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        configure()
+
+    def callCommand(self, *args) -> str:
+        from django.core.management import call_command
+        from ..management.commands.cache_keys import Command
+
+        stdout = io.StringIO()
+        call_command(Command(), *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def testScanReport(self):
+        from ..utils.cache.redis import CommCache
+
+        CommCache.set("test_cache_keys:big", "x" * 4096)
+        CommCache.set("test_cache_keys:small", "x")
+        report = json.loads(self.callCommand("--json", "--match", "test_cache_keys:*", "--samples", "5"))
+        self.assertIn("hot", report)
+        self.assertEqual(report["scan"]["scanned"], 2)
+        self.assertEqual(report["scan"]["largest"][0]["key"], "test_cache_keys:big")
+
+    def testHotOnly(self):
+        report = json.loads(self.callCommand("--json", "--hot"))
+        self.assertNotIn("scan", report)
+
+    def testTextOutput(self):
+        self.assertTrue(self.callCommand("--match", "test_cache_keys:*"))
+
+    def testRejectsFullSampling(self):
+        with self.assertRaises(ValueError):
+            self.callCommand("--samples", "0")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1 +1,10 @@
-from .data_cache import DataCache
+from typing import TYPE_CHECKING
+
+from ..lazy import lazyExports
+
+if TYPE_CHECKING:
+    from .data_cache import DataCache
+
+__getattr__, __dir__ = lazyExports(__name__, {
+    "DataCache": ".data_cache",
+})
@@ -0,0 +1,319 @@
+"""
+缓存热点键 / 大键分析
+
+- KeySampler: 按采样率记录 CommCache 访问的键，使用 Count-Min Sketch 估算访问频次，
+  定期把窗口内的热点键/前缀汇总到 Redis 有序集合，多进程结果可合并查看
+- scanKeys: 基于 SCAN + MEMORY USAGE 非阻塞遍历键空间，统计最大的键与序列化方式分布
+
+settings:
+    CACHE_KEY_SAMPLE_RATE: 采样率（0~1），默认 0 即不采样
+    CACHE_KEY_SAMPLE_PUBLISH_INTERVAL: 汇总到 Redis 的间隔（秒），默认 60
+"""
+import heapq
+import logging
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from ..metrics import keyPrefix
+
+logger = logging.getLogger(__name__)
+
+HOT_KEYS_KEY = "cache_analyzer:hot_keys"
+HOT_PREFIXES_KEY = "cache_analyzer:hot_prefixes"
+# 汇总结果保留时间（秒）
+HOT_KEYS_TTL = 60 * 60
+
+
+def maskKey(cache_key) -> str:
+    """
+    报告中隐藏敏感键
+    ===
+    无前缀的长键（如 DataCache 以原始令牌为键）只保留首尾，避免令牌出现在报告和日志中
+    """
+    if isinstance(cache_key, bytes):
+        cache_key = cache_key.decode("utf-8", "replace")
+    cache_key = str(cache_key)
+    if ":" not in cache_key and len(cache_key) > 24:
+        return f"{cache_key[:6]}...{cache_key[-4:]}"
+    return cache_key
+
+
+class CountMinSketch:
+    """
+    Count-Min Sketch 频次估算
+    ===
+    固定内存（width * depth 个计数器），估算值只会偏大不会偏小
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.tables = [[0] * width for _ in range(depth)]
+        self.total = 0
+
+    def _indexes(self, item: str) -> Iterable[int]:
+        for row in range(self.depth):
+            yield row, hash((row, item)) % self.width
+
+    def add(self, item: str, count: int = 1) -> int:
+        """累加并返回当前估算值"""
+        estimate = None
+        for row, index in self._indexes(item):
+            value = self.tables[row][index] + count
+            self.tables[row][index] = value
+            if estimate is None or value < estimate:
+                estimate = value
+        self.total += count
+        return estimate
+
+    def estimate(self, item: str) -> int:
+        return min(self.tables[row][index] for row, index in self._indexes(item))
+
+    def clear(self) -> None:
+        for table in self.tables:
+            for index in range(self.width):
+                table[index] = 0
+        self.total = 0
+
+
+class KeySampler:
+    """
+    键访问采样器
+    ===
+    只有被采样到的访问才进入 Sketch，热点候选集合保持 capacity 个元素
+    """
+
+    def __init__(self, rate: float = 0.01, capacity: int = 100, publish_interval: int = 60, width: int = 2048, depth: int = 4):
+        self.rate = rate
+        self.capacity = capacity
+        self.publish_interval = publish_interval
+        self.key_sketch = CountMinSketch(width, depth)
+        self.prefix_sketch = CountMinSketch(256, depth)
+        self._candidates: Dict[str, int] = {}
+        self._prefixes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+
+    def record(self, cache_key) -> None:
+        if random.random() >= self.rate:
+            return
+        key = maskKey(cache_key)
+        prefix = keyPrefix(cache_key)
+        with self._lock:
+            self._track(self._candidates, key, self.key_sketch.add(key))
+            self._track(self._prefixes, prefix, self.prefix_sketch.add(prefix))
+            publish = time.monotonic() - self._window_start >= self.publish_interval
+        if publish:
+            self.publish()
+
+    def _track(self, candidates: Dict[str, int], item: str, estimate: int) -> None:
+        """维护热点候选集合：满员时淘汰估算值最小的元素"""
+        if item in candidates or len(candidates) < self.capacity:
+            candidates[item] = estimate
+            return
+        coldest = min(candidates, key=candidates.get)
+        if candidates[coldest] < estimate:
+            del candidates[coldest]
+            candidates[item] = estimate
+
+    def _scaled(self, candidates: Dict[str, int], top: int) -> List[Tuple[str, float]]:
+        items = heapq.nlargest(top, candidates.items(), key=lambda item: item[1])
+        return [(item, count / self.rate) for item, count in items]
+
+    def hottest(self, top: int = 20) -> List[Tuple[str, float]]:
+        """当前窗口内估算访问量最高的键（已按采样率折算）"""
+        with self._lock:
+            return self._scaled(self._candidates, top)
+
+    def hottestPrefixes(self, top: int = 20) -> List[Tuple[str, float]]:
+        with self._lock:
+            return self._scaled(self._prefixes, top)
+
+    def publish(self, client=None) -> None:
+        """把当前窗口结果累加到 Redis 有序集合，并开启新窗口"""
+        with self._lock:
+            keys = self._scaled(self._candidates, self.capacity)
+            prefixes = self._scaled(self._prefixes, self.capacity)
+            self._candidates.clear()
+            self._prefixes.clear()
+            self.key_sketch.clear()
+            self.prefix_sketch.clear()
+            self._window_start = time.monotonic()
+        if not keys and not prefixes:
+            return
+        if client is None:
+            from .redis import getRedis
+            client = getRedis()
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key, score in keys:
+                pipe.zincrby(HOT_KEYS_KEY, score, key)
+            for prefix, score in prefixes:
+                pipe.zincrby(HOT_PREFIXES_KEY, score, prefix)
+            pipe.expire(HOT_KEYS_KEY, HOT_KEYS_TTL)
+            pipe.expire(HOT_PREFIXES_KEY, HOT_KEYS_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning("热点键汇总失败: %s", e)
+
+
+_sampler: Optional[KeySampler] = None
+_configured = False
+
+
+def getSampler() -> Optional[KeySampler]:
+    """按 CACHE_KEY_SAMPLE_RATE 创建的全局采样器，未开启时返回 None"""
+    global _sampler, _configured
+    if not _configured:
+        rate = float(getattr(settings, "CACHE_KEY_SAMPLE_RATE", 0) or 0)
+        if rate > 0:
+            _sampler = KeySampler(
+                rate=rate,
+                publish_interval=getattr(settings, "CACHE_KEY_SAMPLE_PUBLISH_INTERVAL", 60),
+            )
+        _configured = True
+    return _sampler
+
+
+def setSampler(sampler: Optional[KeySampler]) -> None:
+    """手动开启/关闭采样（如临时排查问题）"""
+    global _sampler, _configured
+    _sampler = sampler
+    _configured = True
+
+
+def sampleKey(cache_key) -> None:
+    """CommCache 访问钩子，未开启采样时仅一次判断"""
+    sampler = _sampler if _configured else getSampler()
+    if sampler is not None:
+        sampler.record(cache_key)
+
+
+def publishedHotKeys(top: int = 20, client=None) -> Dict[str, List[Tuple[str, float]]]:
+    """读取各进程汇总到 Redis 的热点键与前缀"""
+    if client is None:
+        from .redis import getRedis
+        client = getRedis()
+
+    def decode(items):
+        return [(k.decode("utf-8", "replace") if isinstance(k, bytes) else k, score) for k, score in items]
+
+    return {
+        "keys": decode(client.zrevrange(HOT_KEYS_KEY, 0, top - 1, withscores=True)),
+        "prefixes": decode(client.zrevrange(HOT_PREFIXES_KEY, 0, top - 1, withscores=True)),
+    }
+
+
+def detectSerializer(head: bytes) -> str:
+    """根据值的前几个字节推断序列化方式"""
+    if not head:
+        return "empty"
+    if head[:1] == b"\x80":
+        return "pickle"
+    if head[:1] in (b"{", b"[", b'"') or head in (b"true", b"false", b"null"):
+        return "json"
+    if head.lstrip(b"-").replace(b".", b"", 1).isdigit():
+        return "number"
+    return "raw"
+
+
+def scanKeys(
+    match: str = "*",
+    count: int = 500,
+    top: int = 20,
+    max_keys: Optional[int] = None,
+    pause: float = 0.0,
+    samples: Optional[int] = None,
+    client=None,
+) -> dict:
+    """
+    非阻塞遍历键空间，统计大键与分布
+    ===
+    Args:
+        match: SCAN 匹配模式
+        count: 每批 SCAN 的 COUNT 提示值（同时也是一次流水线的键数量）
+        top: 返回最大的前 N 个键
+        max_keys: 最多检查的键数量，为空时遍历全部
+        pause: 每批之间休眠的秒数，降低对线上 Redis 的影响
+        samples: MEMORY USAGE 对集合类型的采样元素数，为空时使用服务端默认值（5）；
+                 不允许 0（遍历全部元素，大键会阻塞 Redis）
+    Returns:
+        {"scanned", "total_bytes", "largest", "prefixes", "serializers", "types"}
+    """
+    if samples is not None and samples < 1:
+        raise ValueError("samples 必须为正整数（0 会遍历大键的全部元素并阻塞 Redis）")
+    if client is None:
+        from .redis import getRedis
+        client = getRedis()
+
+    largest: List[Tuple[int, str, str, str]] = []
+    prefixes: Dict[str, List[int]] = {}
+    serializers: Dict[str, List[int]] = {}
+    types: Dict[str, List[int]] = {}
+    scanned = 0
+    total_bytes = 0
+
+    def flush(batch: List[bytes]) -> None:
+        nonlocal scanned, total_bytes
+        pipe = client.pipeline(transaction=False)
+        for key in batch:
+            pipe.memory_usage(key, samples=samples)
+            pipe.type(key)
+            pipe.getrange(key, 0, 7)
+            pipe.strlen(key)
+        # 非字符串类型执行 GETRANGE/STRLEN 会报错，逐条收集结果
+        results = pipe.execute(raise_on_error=False)
+        for index, key in enumerate(batch):
+            size, key_type, head, length = results[index * 4: index * 4 + 4]
+            if not isinstance(size, int):
+                # 不支持 MEMORY USAGE 的服务端（如部分托管 Redis）退化为字符串长度
+                size = length if isinstance(length, int) else 0
+            key_type = key_type.decode() if isinstance(key_type, bytes) else str(key_type)
+            serializer = detectSerializer(head) if key_type == "string" and isinstance(head, bytes) else key_type
+            name = maskKey(key)
+            prefix = keyPrefix(key)
+
+            scanned += 1
+            total_bytes += size
+            for bucket, label in ((prefixes, prefix), (serializers, serializer), (types, key_type)):
+                stat = bucket.setdefault(label, [0, 0])
+                stat[0] += 1
+                stat[1] += size
+            item = (size, name, key_type, serializer)
+            if len(largest) < top:
+                heapq.heappush(largest, item)
+            elif size > largest[0][0]:
+                heapq.heapreplace(largest, item)
+
+    batch: List[bytes] = []
+    for key in client.scan_iter(match=match, count=count):
+        batch.append(key)
+        if len(batch) >= count:
+            flush(batch)
+            batch = []
+            if pause:
+                time.sleep(pause)
+        if max_keys and scanned + len(batch) >= max_keys:
+            break
+    if batch:
+        flush(batch)
+
+    def summary(bucket: Dict[str, List[int]]) -> List[dict]:
+        rows = [{"name": name, "keys": stat[0], "bytes": stat[1]} for name, stat in bucket.items()]
+        return sorted(rows, key=lambda row: row["bytes"], reverse=True)
+
+    return {
+        "scanned": scanned,
+        "total_bytes": total_bytes,
+        "largest": [
+            {"key": name, "bytes": size, "type": key_type, "serializer": serializer}
+            for size, name, key_type, serializer in sorted(largest, reverse=True)
+        ],
+        "prefixes": summary(prefixes)[:top],
+        "serializers": summary(serializers),
+        "types": summary(types),
+    }
@@ -0,0 +1,357 @@
+"""
+缓存熔断器
+
+Redis 卡顿或宕机时，避免每次缓存调用都阻塞到 socket 超时：
+- 连续失败（连接错误、超时，或耗时超过 slow_threshold 的慢调用）达到阈值后熔断（open）
+- 熔断期间 get 优先返回进程内回退缓存中的值，其余命令立即抛出 CircuitOpenError
+- reset_timeout 秒后进入半开（half_open），放行少量探测请求，成功则恢复（closed），失败则继续熔断
+- 状态切换输出日志，并通过 utils.metrics 的 increment 计数
+
+回退缓存为有界 LRU + TTL，由成功的 get 填充，熔断时最多返回 fallback_ttl 秒前的数据。
+写命令（直接调用或经流水线）执行后，无论成功与否都会让回退缓存中对应的键失效。
+回退缓存是进程内的，其他进程的写入无法感知，会话等需要即时失效的数据应使用 getWithoutFallback 读取。
+
+settings:
+    COMM_CACHE_BREAKER: 为空时不启用；True 使用默认参数；或为参数字典：
+        failure_threshold: 连续失败多少次后熔断，默认 5
+        slow_threshold: 慢调用阈值（秒），超过视为失败，默认 0.25，None 表示不检查
+        reset_timeout: 熔断持续时间（秒），之后进入半开，默认 5
+        half_open_calls: 半开状态同时放行的探测请求数，默认 1
+        timeout: 连接/读写超时（秒），默认 0.1
+        fallback_size: 回退缓存最多保存的键数，默认 1024，0 表示不使用回退缓存
+        fallback_ttl: 回退缓存有效期（秒），默认 30
+        fallback_max_value_size: 超过该字节数的值不进入回退缓存，默认 64 KiB
+"""
+import logging
+import threading
+from collections import OrderedDict
+from time import monotonic, perf_counter
+from typing import Any, Callable, Optional, Tuple
+
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+from ..metrics import getExporter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OPTIONS = {
+    "failure_threshold": 5,
+    "slow_threshold": 0.25,
+    "reset_timeout": 5.0,
+    "half_open_calls": 1,
+    "timeout": 0.1,
+    "fallback_size": 1024,
+    "fallback_ttl": 30.0,
+    "fallback_max_value_size": 64 * 1024,
+}
+
+# 视为 Redis 不可用的异常（WRONGTYPE 等命令错误不计入）
+FAILURE_EXCEPTIONS = (RedisConnectionError, RedisTimeoutError, OSError)
+
+# 成功执行后需要让回退缓存中对应键失效的写命令
+_WRITE_COMMANDS = frozenset({
+    "set", "setex", "psetex", "getdel", "getset", "delete", "unlink",
+    "expire", "pexpire", "expireat", "persist", "incr", "incrby", "decr", "decrby", "append",
+})
+# 不经过熔断器的方法（返回迭代器，失败发生在迭代过程中）
+_PASSTHROUGH = frozenset({"scan_iter", "sscan_iter", "hscan_iter", "zscan_iter"})
+
+_MISSING = object()
+
+
+class CircuitOpenError(RedisConnectionError):
+    """熔断中，调用被直接拒绝（继承 redis ConnectionError，原有的异常处理无需修改）"""
+
+
+class CircuitBreaker:
+    """
+    熔断器状态机（线程安全）
+    ===
+    closed --连续失败--> open --reset_timeout--> half_open --探测成功--> closed
+                                                     \\--探测失败--> open
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str = "redis",
+        failure_threshold: int = 5,
+        slow_threshold: Optional[float] = 0.25,
+        reset_timeout: float = 5.0,
+        half_open_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_threshold = slow_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probes = 0
+        self._opened_at = 0.0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        """是否放行本次调用"""
+        if self._state == self.CLOSED:
+            return True
+        with self._lock:
+            if self._state == self.OPEN:
+                if monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._transition(self.HALF_OPEN)
+            if self._state == self.CLOSED:
+                return True
+            if self._probes >= self.half_open_calls:
+                return False
+            self._probes += 1
+            return True
+
+    def onSuccess(self, elapsed: float) -> None:
+        if self.slow_threshold is not None and elapsed > self.slow_threshold:
+            self.onFailure(reason="slow")
+            return
+        if self._state == self.CLOSED:
+            self._failures = 0
+            return
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._transition(self.CLOSED)
+
+    def onFailure(self, reason: str = "error") -> None:
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._transition(self.OPEN, reason)
+            elif self._state == self.CLOSED:
+                self._failures += 1
+                if self._failures >= self.failure_threshold:
+                    self._transition(self.OPEN, reason)
+
+    def reset(self) -> None:
+        """强制恢复为 closed"""
+        with self._lock:
+            if self._state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def _transition(self, state: str, reason: Optional[str] = None) -> None:
+        previous, self._state = self._state, state
+        self._failures = 0
+        self._probes = 0
+        if state == self.OPEN:
+            self._opened_at = monotonic()
+            logger.error(
+                "缓存熔断器 %s 熔断（%s -> open，原因：%s），%.1f 秒后尝试恢复",
+                self.name, previous, reason, self.reset_timeout,
+            )
+        elif state == self.CLOSED:
+            logger.warning("缓存熔断器 %s 已恢复（%s -> closed）", self.name, previous)
+        else:
+            logger.info("缓存熔断器 %s 进入半开状态，放行探测请求", self.name)
+        getExporter().increment("cache_breaker_transitions_total", {"breaker": self.name, "state": state})
+
+
+class LocalCache:
+    """有界 LRU + TTL 进程内缓存（线程安全）"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0, max_value_size: int = 64 * 1024):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_value_size = max_value_size
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key) -> Any:
+        """返回缓存值，不存在或已过期时返回 _MISSING"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            if item[0] < monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value) -> None:
+        if isinstance(value, (bytes, str)) and len(value) > self.max_value_size:
+            self.discard(key)
+            return
+        with self._lock:
+            self._data[key] = (monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, *keys) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _writtenKeys(name: str, args: tuple) -> tuple:
+    """写命令涉及的键（delete/unlink 为全部参数，其余为第一个参数）"""
+    return args if name in ("delete", "unlink") else args[:1]
+
+
+class BreakerPipeline:
+    """流水线包装：execute 经过熔断器，命令缓冲原样转发，并记录写命令涉及的键"""
+
+    def __init__(self, pipe, client: "BreakerClient"):
+        self._pipe = pipe
+        self._client = client
+        self._written: list = []
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._pipe, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        def command(*args, **kwargs):
+            if name in _WRITE_COMMANDS:
+                self._written.extend(_writtenKeys(name, args))
+            result = attr(*args, **kwargs)
+            # 链式调用继续经过包装
+            return self if result is self._pipe else result
+        command.__name__ = name
+        return command
+
+    def __len__(self) -> int:
+        return len(self._pipe)
+
+    def __enter__(self) -> "BreakerPipeline":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._written = []
+        self._pipe.reset()
+
+    def execute(self, *args, **kwargs):
+        written, self._written = self._written, []
+        try:
+            return self._client.call("pipeline", self._pipe.execute, *args, **kwargs)
+        finally:
+            # 执行失败时写入可能已部分生效，同样失效
+            if written and self._client.fallback is not None:
+                self._client.fallback.discard(*written)
+
+
+class BreakerClient:
+    """
+    为 Redis 客户端（单节点 / Cluster / 分片）加上熔断与本地回退
+    ===
+    命令方法在首次访问时包装并缓存在实例上，之后的调用只多一次状态判断与计时
+    """
+
+    def __init__(self, client, breaker: CircuitBreaker, fallback: Optional[LocalCache] = None):
+        self.__wrapped__ = client
+        self.breaker = breaker
+        self.fallback = fallback
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.__wrapped__, name)
+        if not callable(attr) or name in _PASSTHROUGH or name.startswith("_"):
+            return attr
+        if name == "get":
+            def wrapped(*args, **kwargs):
+                return self._get(*args, **kwargs)
+        elif name == "pipeline":
+            def wrapped(*args, **kwargs):
+                return BreakerPipeline(attr(*args, **kwargs), self)
+        elif name in _WRITE_COMMANDS and self.fallback is not None:
+            def wrapped(*args, **kwargs):
+                try:
+                    return self.call(name, attr, *args, **kwargs)
+                finally:
+                    self.fallback.discard(*_writtenKeys(name, args))
+        else:
+            def wrapped(*args, **kwargs):
+                return self.call(name, attr, *args, **kwargs)
+        wrapped.__name__ = name
+        self.__dict__[name] = wrapped
+        return wrapped
+
+    def call(self, name: str, func: Callable, *args, **kwargs):
+        """经过熔断器执行命令"""
+        breaker = self.breaker
+        if not breaker.allow():
+            getExporter().increment("cache_breaker_rejected_total", {"breaker": breaker.name})
+            raise CircuitOpenError(f"缓存熔断中（{breaker.name}），已拒绝 {name}")
+        start = perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except FAILURE_EXCEPTIONS:
+            breaker.onFailure()
+            raise
+        except Exception:
+            # 命令错误说明 Redis 可用
+            breaker.onSuccess(perf_counter() - start)
+            raise
+        breaker.onSuccess(perf_counter() - start)
+        return result
+
+    def getWithoutFallback(self, name, *args, **kwargs):
+        """经过熔断器读取，但不使用也不填充回退缓存（会话、令牌等需要即时失效的数据）"""
+        return self.call("get", self.__wrapped__.get, name, *args, **kwargs)
+
+    def _get(self, name, *args, **kwargs):
+        fallback = self.fallback
+        if fallback is None:
+            return self.call("get", self.__wrapped__.get, name, *args, **kwargs)
+        try:
+            value = self.call("get", self.__wrapped__.get, name, *args, **kwargs)
+        except FAILURE_EXCEPTIONS:
+            value = fallback.get(name)
+            if value is _MISSING:
+                raise
+            getExporter().increment("cache_breaker_fallback_total", {"breaker": self.breaker.name})
+            return value
+        fallback.set(name, value)
+        return value
+
+
+def breakerOptions(config) -> Optional[dict]:
+    """解析 COMM_CACHE_BREAKER 配置，未启用时返回 None"""
+    if not config:
+        return None
+    options = dict(DEFAULT_OPTIONS)
+    if isinstance(config, dict):
+        unknown = set(config) - set(DEFAULT_OPTIONS)
+        if unknown:
+            raise ValueError(f"COMM_CACHE_BREAKER 中存在未知参数：{', '.join(sorted(unknown))}")
+        options.update(config)
+    return options
+
+
+def wrapClient(client, options: dict, name: str = "redis") -> BreakerClient:
+    """按配置为客户端加上熔断器"""
+    breaker = CircuitBreaker(
+        name=name,
+        failure_threshold=options["failure_threshold"],
+        slow_threshold=options["slow_threshold"],
+        reset_timeout=options["reset_timeout"],
+        half_open_calls=options["half_open_calls"],
+    )
+    fallback = None
+    if options["fallback_size"]:
+        fallback = LocalCache(
+            maxsize=options["fallback_size"],
+            ttl=options["fallback_ttl"],
+            max_value_size=options["fallback_max_value_size"],
+        )
+    return BreakerClient(client, breaker, fallback)
@@ -0,0 +1,336 @@
+"""
+缓存客户端
+
+根据配置创建 CommCache 使用的 Redis 客户端：
+- single: 单节点，复用 django-redis 连接池（默认）
+- cluster: Redis Cluster（redis.cluster.RedisCluster）
+- sharded: 多个独立节点，客户端一致性哈希分片
+
+settings:
+    COMM_CACHE_MODE: "single" | "cluster" | "sharded"，默认 "single"
+    COMM_CACHE_ALIAS: single 模式使用的 CACHES 别名，默认 "default"
+    COMM_CACHE_NODES: cluster/sharded 模式的节点 URL 列表（cluster 模式任一节点即可）
+    COMM_CACHE_OPTIONS: 创建客户端的额外参数（如 socket_timeout）
+    COMM_CACHE_BREAKER: 熔断器配置，见 utils.cache.breaker
+"""
+import bisect
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+
+def hashTag(cache_key) -> bytes:
+    """
+    取参与分片计算的部分（与 Redis Cluster 规则一致）
+    ===
+    键中包含非空的 {...} 时只用第一个花括号内的内容，
+    如 "sessions:{42}" 与 "profile:{42}" 落在同一槽位/节点
+    """
+    if isinstance(cache_key, str):
+        cache_key = cache_key.encode("utf-8")
+    start = cache_key.find(b"{")
+    if start != -1:
+        end = cache_key.find(b"}", start + 1)
+        if end > start + 1:
+            return cache_key[start + 1:end]
+    return cache_key
+
+
+def tagKey(prefix: str, tag: Any, *parts: Any) -> str:
+    """
+    生成带 hash tag 的键：tagKey("sessions", 42) => "sessions:{42}"
+    ===
+    同一 tag 的键在 cluster/sharded 模式下位于同一节点，可在同一事务中操作
+    """
+    return ":".join([prefix, f"{{{tag}}}", *map(str, parts)])
+
+
+def nodeName(client) -> str:
+    """
+    节点标识（用于一致性哈希）
+    ===
+    取连接参数中的 host:port/db（Unix socket 为路径），不含密码，修改密码不会改变键的分布
+    """
+    kwargs = client.connection_pool.connection_kwargs
+    if kwargs.get("path"):
+        return f"unix://{kwargs['path']}/{kwargs.get('db', 0)}"
+    return f"{kwargs.get('host', 'localhost')}:{kwargs.get('port', 6379)}/{kwargs.get('db', 0)}"
+
+
+# 分片模式下按第一个参数（键）路由的单键命令，其余命令不代理
+SINGLE_KEY_COMMANDS = frozenset({
+    # 字符串
+    "get", "set", "setex", "setnx", "psetex", "getset", "getdel", "getex", "append",
+    "getrange", "setrange", "strlen", "incr", "incrby", "incrbyfloat", "decr", "decrby",
+    # 键
+    "expire", "pexpire", "expireat", "pexpireat", "persist", "ttl", "pttl", "type", "memory_usage",
+    # 哈希
+    "hget", "hset", "hsetnx", "hmget", "hgetall", "hdel", "hexists", "hincrby", "hincrbyfloat",
+    "hkeys", "hvals", "hlen",
+    # 集合
+    "sadd", "srem", "sismember", "smismember", "smembers", "scard", "spop", "srandmember",
+    # 有序集合
+    "zadd", "zrem", "zincrby", "zscore", "zrank", "zrevrank", "zcard", "zcount", "zrange", "zrevrange",
+    "zrangebyscore", "zrevrangebyscore", "zremrangebyscore", "zremrangebyrank",
+    # 列表
+    "lpush", "rpush", "lpop", "rpop", "lrange", "llen", "ltrim", "lrem", "lindex",
+})
+# 参数均为键的多键命令，按节点拆分后合计结果
+MULTI_KEY_COMMANDS = frozenset({"delete", "unlink", "exists", "touch"})
+
+
+class ShardedRedis:
+    """
+    客户端一致性哈希分片
+    ===
+    单键命令（SINGLE_KEY_COMMANDS）按键路由到节点；多键命令按节点分组后并行执行，
+    其余命令（跨节点无法保证语义，如 eval、rename）不支持，访问时抛出 AttributeError。
+    环上的虚拟节点由节点标识（默认 host:port/db）计算，与节点在列表中的位置无关，
+    增减或调整节点顺序时只有约 1/N 的键需要迁移
+    """
+
+    def __init__(self, clients: Sequence[Any], replicas: int = 160, names: Optional[Sequence[str]] = None):
+        if not clients:
+            raise ImproperlyConfigured("COMM_CACHE_NODES 不能为空")
+        self.clients = list(clients)
+        names = list(names) if names is not None else [nodeName(client) for client in self.clients]
+        if len(set(names)) != len(self.clients):
+            raise ImproperlyConfigured(f"COMM_CACHE_NODES 中存在重复节点：{names}")
+        self._ring: List[int] = []
+        self._ring_nodes: List[Any] = []
+        points = []
+        for name, client in zip(names, self.clients):
+            for replica in range(replicas):
+                points.append((self._hash(f"{name}-{replica}".encode()), client))
+        points.sort(key=lambda point: point[0])
+        self._ring = [point[0] for point in points]
+        self._ring_nodes = [point[1] for point in points]
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @staticmethod
+    def _hash(value: bytes) -> int:
+        return int.from_bytes(hashlib.md5(value).digest()[:8], "big")
+
+    def getNode(self, cache_key):
+        """键所在节点"""
+        index = bisect.bisect(self._ring, self._hash(hashTag(cache_key)))
+        return self._ring_nodes[index % len(self._ring_nodes)]
+
+    def groupByNode(self, keys: Iterable[Any]) -> Dict[Any, List[Tuple[int, Any]]]:
+        """按节点分组，保留原始位置"""
+        groups: Dict[Any, List[Tuple[int, Any]]] = defaultdict(list)
+        for position, key in enumerate(keys):
+            groups[self.getNode(key)].append((position, key))
+        return groups
+
+    def runParallel(self, tasks: List[Tuple[Any, Any]]) -> List[Any]:
+        """并行执行 (函数, 参数) 列表；只有一个任务时直接在当前线程执行"""
+        if len(tasks) == 1:
+            func, arg = tasks[0]
+            return [func(arg)]
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=len(self.clients), thread_name_prefix="comm-cache")
+        futures = [self._executor.submit(func, arg) for func, arg in tasks]
+        return [future.result() for future in futures]
+
+    def __getattr__(self, name: str):
+        if name not in SINGLE_KEY_COMMANDS:
+            raise AttributeError(f"{type(self).__name__} 不支持 {name!r}")
+
+        # 单键命令：第一个参数为键
+        def command(cache_key, *args, **kwargs):
+            return getattr(self.getNode(cache_key), name)(cache_key, *args, **kwargs)
+        command.__name__ = name
+        return command
+
+    def _multiKey(self, name: str, keys: Sequence[Any]) -> List[Any]:
+        """多键命令按节点分组并行执行，返回各节点的结果"""
+        def run(node_items):
+            node, items = node_items
+            return getattr(node, name)(*[key for _, key in items])
+        return self.runParallel([(run, node_items) for node_items in self.groupByNode(keys).items()])
+
+    def delete(self, *keys) -> int:
+        return sum(self._multiKey("delete", keys)) if keys else 0
+
+    def unlink(self, *keys) -> int:
+        return sum(self._multiKey("unlink", keys)) if keys else 0
+
+    def exists(self, *keys) -> int:
+        return sum(self._multiKey("exists", keys)) if keys else 0
+
+    def touch(self, *keys) -> int:
+        return sum(self._multiKey("touch", keys)) if keys else 0
+
+    def mget(self, keys: Sequence[Any]) -> List[Any]:
+        keys = list(keys)
+        results: List[Any] = [None] * len(keys)
+
+        def run(node_items):
+            node, items = node_items
+            return items, node.mget([key for _, key in items])
+
+        for items, values in self.runParallel([(run, node_items) for node_items in self.groupByNode(keys).items()]):
+            for (position, _), value in zip(items, values):
+                results[position] = value
+        return results
+
+    def mset(self, mapping: Dict[Any, Any]) -> bool:
+        def run(node_items):
+            node, items = node_items
+            return node.mset({key: mapping[key] for _, key in items})
+        self.runParallel([(run, node_items) for node_items in self.groupByNode(mapping).items()])
+        return True
+
+    def scan_iter(self, match: Optional[str] = None, count: Optional[int] = None, **kwargs) -> Iterator[Any]:
+        for client in self.clients:
+            yield from client.scan_iter(match=match, count=count, **kwargs)
+
+    def pipeline(self, transaction: bool = True) -> "ShardedPipeline":
+        return ShardedPipeline(self, transaction)
+
+
+class ShardedPipeline:
+    """
+    分片流水线
+    ===
+    命令按键缓冲，execute 时每个节点一个流水线并行执行，结果按原始顺序返回。
+    transaction=True 时单个节点内的命令为 MULTI/EXEC 原子执行（跨节点不保证原子性）
+    """
+
+    def __init__(self, sharded: ShardedRedis, transaction: bool = True):
+        self.sharded = sharded
+        self.transaction = transaction
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        if name not in SINGLE_KEY_COMMANDS and name not in MULTI_KEY_COMMANDS:
+            raise AttributeError(f"{type(self).__name__} 不支持 {name!r}")
+
+        def command(cache_key, *args, **kwargs):
+            # 流水线中的命令整体路由到一个节点，多键命令只能带一个键
+            if name in MULTI_KEY_COMMANDS and args:
+                raise ValueError(f"分片流水线中的 {name} 只支持单个键，多个键请分别调用")
+            self._commands.append((name, (cache_key, *args), kwargs))
+            return self
+        command.__name__ = name
+        return command
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def __enter__(self) -> "ShardedPipeline":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._commands = []
+
+    def execute(self, raise_on_error: bool = True) -> List[Any]:
+        commands, self._commands = self._commands, []
+        if not commands:
+            return []
+        groups = self.sharded.groupByNode(args[0] for _, args, _ in commands)
+
+        def run(node_items):
+            node, items = node_items
+            pipe = node.pipeline(transaction=self.transaction)
+            for position, _ in items:
+                name, args, kwargs = commands[position]
+                getattr(pipe, name)(*args, **kwargs)
+            return items, pipe.execute(raise_on_error=raise_on_error)
+
+        results: List[Any] = [None] * len(commands)
+        for items, values in self.sharded.runParallel([(run, node_items) for node_items in groups.items()]):
+            for (position, _), value in zip(items, values):
+                results[position] = value
+        return results
+
+
+def withTimeouts(client, options: Dict[str, Any]):
+    """
+    以已有客户端的连接参数创建独立连接池，并覆盖超时参数
+    ===
+    single 模式复用 django-redis 的连接池，直接修改会影响 Django 缓存本身，故另建连接池
+    """
+    from redis import ConnectionPool, Redis
+    pool = client.connection_pool
+    if type(pool) is not ConnectionPool:
+        logger.warning("连接池类型 %s 不支持覆盖超时参数，请在 CACHES 的 OPTIONS 中配置 SOCKET_TIMEOUT", type(pool).__name__)
+        return client
+    kwargs = {**pool.connection_kwargs, **options}
+    return Redis(connection_pool=ConnectionPool(
+        connection_class=pool.connection_class,
+        max_connections=pool.max_connections,
+        **kwargs,
+    ))
+
+
+def createClient():
+    """按 COMM_CACHE_MODE 创建客户端，配置 COMM_CACHE_BREAKER 时加上熔断器"""
+    options = dict(getattr(settings, "COMM_CACHE_OPTIONS", {}) or {})
+    breaker = None
+    config = getattr(settings, "COMM_CACHE_BREAKER", None)
+    if config:
+        from .breaker import breakerOptions, wrapClient
+        breaker = breakerOptions(config)
+        # 收紧超时：Redis 卡顿时单次调用最多阻塞 timeout 秒（COMM_CACHE_OPTIONS 中显式配置的优先）
+        options.setdefault("socket_timeout", breaker["timeout"])
+        options.setdefault("socket_connect_timeout", breaker["timeout"])
+
+    client = _createClient(options, tighten=breaker is not None)
+    if breaker is not None:
+        client = wrapClient(client, breaker)
+    return client
+
+
+def _createClient(options: Dict[str, Any], tighten: bool = False):
+    mode = getattr(settings, "COMM_CACHE_MODE", "single")
+
+    if mode == "single":
+        from django_redis import get_redis_connection
+        client = get_redis_connection(getattr(settings, "COMM_CACHE_ALIAS", "default"))
+        if tighten:
+            client = withTimeouts(client, options)
+        return client
+
+    nodes = list(getattr(settings, "COMM_CACHE_NODES", []) or [])
+    if not nodes:
+        raise ImproperlyConfigured(f"COMM_CACHE_MODE={mode!r} 时必须配置 COMM_CACHE_NODES")
+
+    if mode == "cluster":
+        from redis.cluster import RedisCluster
+        return RedisCluster.from_url(nodes[0], **options)
+
+    if mode == "sharded":
+        from redis import Redis
+        return ShardedRedis([Redis.from_url(url, **options) for url in nodes])
+
+    raise ImproperlyConfigured(f"不支持的 COMM_CACHE_MODE：{mode!r}")
+
+
+@lru_cache(maxsize=None)
+def _clusterClass():
+    # 延迟导入，避免导入本模块时加载 redis
+    from redis.cluster import RedisCluster
+    return RedisCluster
+
+
+def isCluster(client) -> bool:
+    """Redis Cluster 客户端的多键命令需使用 *_nonatomic 版本"""
+    # 熔断器包装后的客户端按原始客户端判断
+    return isinstance(getattr(client, "__wrapped__", client), _clusterClass())
@@ -1,45 +1,302 @@
-from typing import Any, Optional
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 import logging
 from django.conf import settings
-from .redis import CommCache
+from ..metrics import observe
+from .analyzer import sampleKey
+from .redis import CommCache, getRedis
 
 logger = logging.getLogger(__name__)
 
+# 缓冲中的操作类型
+_READ, _SAVE, _UPDATE, _DELETE = "read", "save", "update", "delete"
+
+
+def _decodeToken(token) -> str:
+    return token.decode("utf-8") if isinstance(token, bytes) else token
+
+
+class SessionBatch:
+    """
+    请求内的会话写入缓冲（工作单元）
+    ===
+    同一令牌的多次 saveData / updateData / deleteData 合并为最终状态，
+    flush 时在一条流水线中写入；缓冲期间 getData 读到的是缓冲后的值。
+    缓冲中保存序列化后的字节，读取时重新反序列化，与直接读 Redis 的语义一致
+    （修改返回值不会影响缓冲）。
+    开启缓冲的类的子类共用同一缓冲，每个条目记录所属的类，写入时使用该类的配置。
+    """
+    __slots__ = ("cache", "entries")
+
+    def __init__(self, cache):
+        self.cache = cache
+        # 令牌 => [操作, 序列化后的会话（不存在时为 None）, 用户ID, 最大会话数, 所属的类]
+        self.entries: Dict[str, list] = {}
+
+    def __len__(self) -> int:
+        return sum(1 for entry in self.entries.values() if entry[0] != _READ)
+
+    def discard(self) -> None:
+        """丢弃未写入的操作"""
+        self.entries.clear()
+
+    def flush(self) -> None:
+        """将缓冲的写操作在一条流水线中写入 Redis"""
+        entries, self.entries = self.entries, {}
+        writes = [(token, entry) for token, entry in entries.items() if entry[0] != _READ]
+        if not writes:
+            return
+        now = time.time()
+        # (流水线结果位置, 操作, 令牌, 用户ID, 最大会话数, 所属的类)
+        followups = []
+        with observe("cache.flush_sessions", prefix=self.cache.metrics_prefix, phase="cache") as ob:
+            size = 0
+            pipe = self.cache.pipeline()
+            for token, (op, payload, user_id, max_sessions, cache) in writes:
+                if op == _SAVE:
+                    size += len(payload)
+                    if cache._queueSave(pipe, token, payload, user_id, max_sessions, cache.sessionTimeout(), now):
+                        followups.append((len(pipe) - 1, _SAVE, token, user_id, max_sessions, cache))
+                elif op == _UPDATE:
+                    size += len(payload)
+                    # 只更新仍存在的会话并保留剩余有效期，避免复活已注销/过期的令牌（KEEPTTL 需 Redis 6.0+）
+                    pipe.set(token, payload, xx=True, keepttl=True)
+                elif user_id is None:
+                    # 不知道所属用户：取回会话中记录的 user_id 后再清理索引（GET+DEL 兼容 Redis 6.2 以下版本）
+                    pipe.get(token)
+                    followups.append((len(pipe) - 1, _DELETE, token, None, None, cache))
+                    pipe.delete(token)
+                else:
+                    pipe.delete(token)
+                    pipe.zrem(cache.sessionIndexKey(user_id), token)
+            results = pipe.execute()
+            ob.size = size
+
+        for position, op, token, user_id, max_sessions, cache in followups:
+            result = results[position]
+            if op == _SAVE:
+                cache._evictOverflow(user_id, max_sessions, result)
+            elif result:
+                cache_data = cache.dataProcess(result, pick_ser=True, method="loads")
+                user_id = cache_data.get("user_id") if isinstance(cache_data, dict) else None
+                if user_id is not None:
+                    cache._revokeTokens(cache.sessionIndexKey(user_id), [], members=[token])
+
+
+_batch: ContextVar[Optional[SessionBatch]] = ContextVar("session_batch", default=None)
+
 
 class DataCache(CommCache):
     """
     数据缓存工具
+    ===
+    会话以令牌为键保存；传入 user_id 时同时维护用户会话索引
+    sessions:{user_id}（ZSET，成员为令牌，分值为过期时间戳），
+    用于列出用户会话、注销全部会话和限制同时在线的会话数。
+    过期成员在写入/查询索引时顺带清理。
+
+    处于 batch()（或 SessionBatchMiddleware）中时，saveData / updateData / deleteData
+    先写入请求内缓冲，同一令牌的多次修改合并后在退出时一次性写入。
+    缓冲写入使用 SET ... XX KEEPTTL，需要 Redis 6.0 及以上版本。
+
+    settings:
+        LOGIN_EXPIRED_TIME: 会话有效期（秒），默认 7 天
+        MAX_SESSIONS_PER_USER: 每个用户最多保留的会话数，超出时注销最早的会话，默认不限制
     """
+    # 会话键为原始令牌，统一归入 session 标签
+    metrics_prefix = "session"
+    # 已注销的会话在熔断期间也不能从进程内回退缓存中读到
+    local_fallback = False
+    # 用户会话索引键前缀
+    session_index_prefix = "sessions"
+
+    @classmethod
+    def sessionIndexKey(cls, user_id: Any) -> str:
+        """用户会话索引键，如 sessions:{42}"""
+        return cls.tagKey(cls.session_index_prefix, user_id)
+
+    @staticmethod
+    def sessionTimeout() -> int:
+        return getattr(settings, "LOGIN_EXPIRED_TIME", 60 * 60 * 24 * 7)
+
+    @classmethod
+    def startBatch(cls) -> Token:
+        """开启当前上下文的写入缓冲，返回用于恢复的 Token"""
+        return _batch.set(SessionBatch(cls))
+
+    @classmethod
+    def getBatch(cls) -> Optional[SessionBatch]:
+        """当前上下文的写入缓冲，未开启时返回 None"""
+        batch = _batch.get()
+        # 子类共用父类开启的缓冲（如 SessionBatchMiddleware 开启的 DataCache 缓冲）
+        return batch if batch is not None and issubclass(cls, batch.cache) else None
+
+    @staticmethod
+    def resetBatch(token: Token) -> None:
+        _batch.reset(token)
+
+    @classmethod
+    @contextmanager
+    def batch(cls) -> Iterator[SessionBatch]:
+        """
+        写入缓冲上下文
+        ===
+        正常退出时写入，抛出异常时丢弃；嵌套使用时由最外层统一写入
+
+            with DataCache.batch():
+                DataCache.updateData(token, ...)
+                DataCache.updateData(token, ...)
+        """
+        current = cls.getBatch()
+        if current is not None:
+            yield current
+            return
+        token = cls.startBatch()
+        batch = _batch.get()
+        try:
+            yield batch
+            batch.flush()
+        finally:
+            cls.resetBatch(token)
+
+    @classmethod
+    def _bufferedRead(cls, batch: SessionBatch, token: str) -> list:
+        """缓冲中的条目，未命中时从 Redis 读取并缓存（同一请求内不重复读取）"""
+        entry = batch.entries.get(token)
+        if entry is None:
+            entry = batch.entries[token] = [_READ, cls.get(token), None, None, cls]
+        return entry
 
     @classmethod
     def getData(cls, cache_key: str) -> Optional[Any]:
+        batch = cls.getBatch()
+        if batch is not None:
+            payload = cls._bufferedRead(batch, cache_key)[1]
+            return cls.dataProcess(payload, pick_ser=True, method="loads") if payload else None
         cache_data = cls.get(cache_key, pick_ser=True)
         return cache_data
 
     @classmethod
-    def saveData(cls, token: str, data: Any, extra: Optional[dict] = None):
+    def saveData(
+        cls,
+        token: str,
+        data: Any,
+        extra: Optional[dict] = None,
+        user_id: Any = None,
+        max_sessions: Optional[int] = None,
+    ):
+        """
+        保存会话
+        ===
+        传入 user_id 时，会话写入、索引过期清理、索引登记和超限检查在同一流水线中完成
+        （单节点为 MULTI/EXEC 事务；cluster/sharded 模式下令牌与索引可能不在同一节点，不保证原子性）。
+
+        Args:
+            token: 令牌
+            data: 会话数据
+            extra: 额外字段
+            user_id: 用户ID，为空时不维护会话索引
+            max_sessions: 最大会话数，为空时读取 settings.MAX_SESSIONS_PER_USER
+        """
         extra = dict(extra or {})
         cache_data = {
             **extra,
             "data": data,
             "token": token,
         }
-        timeout = getattr(settings, "LOGIN_EXPIRED_TIME", 60 * 60 * 24 * 7)
-        cls.set(token, cache_data, timeout=timeout, pick_ser=True)
+        if user_id is not None:
+            cache_data["user_id"] = user_id
+            if max_sessions is None:
+                max_sessions = getattr(settings, "MAX_SESSIONS_PER_USER", None)
+
+        batch = cls.getBatch()
+        if batch is not None:
+            payload = cls.dataProcess(cache_data, pick_ser=True, method="dumps")
+            batch.entries[token] = [_SAVE, payload, user_id, max_sessions, cls]
+            return
+
+        timeout = cls.sessionTimeout()
+        if user_id is None:
+            cls.set(token, cache_data, timeout=timeout, pick_ser=True)
+            return
+
+        sampleKey(token)
+        with observe("cache.save_session", key=token, prefix=cls.metrics_prefix, phase="cache") as ob:
+            payload = cls.dataProcess(cache_data, pick_ser=True, method="dumps")
+            ob.size = len(payload)
+            pipe = cls.pipeline()
+            checked = cls._queueSave(pipe, token, payload, user_id, max_sessions, timeout, time.time())
+            results = pipe.execute()
+
+        if checked:
+            cls._evictOverflow(user_id, max_sessions, results[-1])
+
+    @classmethod
+    def _queueSave(
+        cls,
+        pipe,
+        token: str,
+        payload: bytes,
+        user_id: Any,
+        max_sessions: Optional[int],
+        timeout: int,
+        now: float,
+    ) -> bool:
+        """
+        向流水线追加保存会话的命令
+        :return: 是否追加了超限检查（其结果为最后一条命令的返回值）
+        """
+        pipe.set(token, payload, ex=timeout)
+        if user_id is None:
+            return False
+        index_key = cls.sessionIndexKey(user_id)
+        pipe.zremrangebyscore(index_key, "-inf", now)
+        pipe.zadd(index_key, {token: now + timeout})
+        # 所有会话有效期相同，最新会话最晚过期，索引跟随其过期
+        pipe.expire(index_key, timeout)
+        if not max_sessions:
+            return False
+        # 按过期时间倒序，第 max_sessions 个之后的即为需要注销的旧会话
+        pipe.zrevrange(index_key, max_sessions, -1)
+        return True
+
+    @classmethod
+    def _evictOverflow(cls, user_id: Any, max_sessions: int, overflow: Optional[List[Any]]) -> None:
+        """注销超出数量限制的旧会话"""
+        if not overflow:
+            return
+        evicted = [_decodeToken(item) for item in overflow]
+        cls._revokeTokens(cls.sessionIndexKey(user_id), evicted)
+        logger.info("用户 %s 会话数超过 %s，已注销最早的 %s 个会话", user_id, max_sessions, len(evicted))
 
     @classmethod
     def updateData(cls, token: str, data: Any, extra: Optional[dict] = None):
         extra = dict(extra or {})
-        cache_payload = cls.get(token, pick_ser=True)
+        batch = cls.getBatch()
+        if batch is not None:
+            entry = cls._bufferedRead(batch, token)
+            cache_payload = cls.dataProcess(entry[1], pick_ser=True, method="loads") if entry[1] else None
+        else:
+            cache_payload = cls.get(token, pick_ser=True)
         if not cache_payload:
             logger.debug("token %s 未命中缓存，跳过更新", token)
             return None
 
-        timeout = cls.ttl(token)
         merged = dict(cache_payload)
         merged.update(extra)
         merged.update({"data": data, "token": token})
+        if batch is not None:
+            # 已缓冲的保存仍为保存，其余合并为一次更新
+            entry[1] = cls.dataProcess(merged, pick_ser=True, method="dumps")
+            entry[4] = cls
+            if entry[0] == _READ:
+                entry[0] = _UPDATE
+            return merged
+
+        timeout = cls.ttl(token)
         if timeout and timeout > 0:
             cls.set(token, merged, timeout=timeout, pick_ser=True)
         else:
@@ -47,5 +304,89 @@ class DataCache(CommCache):
         return merged
 
     @classmethod
-    def deleteData(cls, token: str) -> None:
-        cls.delete(token)
+    def deleteData(cls, token: str, user_id: Any = None) -> None:
+        """
+        删除会话，并从用户会话索引中移除
+        ===
+        未传 user_id 时在同一事务流水线中 GET+DEL 取回会话中记录的 user_id（多一次往返；
+        不使用 GETDEL，兼容 Redis 6.2 以下版本）
+        """
+        batch = cls.getBatch()
+        if batch is not None:
+            entry = batch.entries.get(token)
+            if user_id is None and entry is not None and entry[1]:
+                cache_data = cls.dataProcess(entry[1], pick_ser=True, method="loads")
+                user_id = cache_data.get("user_id") if isinstance(cache_data, dict) else None
+            batch.entries[token] = [_DELETE, None, user_id, None, cls]
+            return
+
+        if user_id is None:
+            sampleKey(token)
+            with observe("cache.delete", key=token, prefix=cls.metrics_prefix, phase="cache"):
+                pipe = cls.pipeline()
+                pipe.get(token)
+                pipe.delete(token)
+                payload = pipe.execute()[0]
+            if not payload:
+                return
+            cache_data = cls.dataProcess(payload, pick_ser=True, method="loads")
+            user_id = cache_data.get("user_id") if isinstance(cache_data, dict) else None
+            if user_id is not None:
+                cls._revokeTokens(cls.sessionIndexKey(user_id), [], members=[token])
+            return
+
+        cls._revokeTokens(cls.sessionIndexKey(user_id), [token])
+
+    @classmethod
+    def listSessions(cls, user_id: Any) -> List[dict]:
+        """
+        列出用户的有效会话（按过期时间倒序，即最新的在前）
+        :return: [{"token": 令牌, "expire_at": 过期时间戳}, ...]
+        """
+        index_key = cls.sessionIndexKey(user_id)
+        with observe("cache.list_sessions", key=index_key, prefix=cls.metrics_prefix, phase="cache"):
+            pipe = cls.pipeline()
+            pipe.zremrangebyscore(index_key, "-inf", time.time())
+            pipe.zrevrange(index_key, 0, -1, withscores=True)
+            members = pipe.execute()[-1]
+        return [{"token": _decodeToken(token), "expire_at": int(score)} for token, score in members]
+
+    @classmethod
+    def revokeAll(cls, user_id: Any, except_token: Optional[str] = None) -> int:
+        """
+        注销用户的全部会话（如修改密码、封禁）
+        只从索引中移除读取到的令牌（不删除整个索引），读取之后新保存的会话仍留在索引中，可以被列出和注销
+        :param except_token: 保留的令牌（如当前会话）
+        :return: 注销的会话数
+        """
+        index_key = cls.sessionIndexKey(user_id)
+        with observe("cache.read_session_index", key=index_key, prefix=cls.metrics_prefix, phase="cache"):
+            tokens = [_decodeToken(token) for token in getRedis().zrange(index_key, 0, -1)]
+        tokens = [token for token in tokens if token != except_token]
+        if tokens:
+            cls._revokeTokens(index_key, tokens)
+        logger.info("用户 %s 已注销 %s 个会话", user_id, len(tokens))
+        return len(tokens)
+
+    @classmethod
+    def _revokeTokens(
+        cls,
+        index_key: str,
+        tokens: Iterable[str],
+        members: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        单次流水线删除会话键并从索引移除
+        :param tokens: 需要删除会话键的令牌
+        :param members: 只从索引移除的令牌，默认与 tokens 相同
+        """
+        tokens = list(tokens)
+        members = tokens if members is None else list(members)
+        with observe("cache.revoke_sessions", key=index_key, prefix=cls.metrics_prefix, phase="cache"):
+            pipe = cls.pipeline()
+            # 逐个删除：cluster/sharded 模式下令牌分布在不同节点
+            for token in tokens:
+                pipe.delete(token)
+            if members:
+                pipe.zrem(index_key, *members)
+            pipe.execute()
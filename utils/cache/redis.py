@@ -1,16 +1,47 @@
-from redis import Redis
-from django_redis import get_redis_connection
-# 连接到默认的Redis数据库
-redis: Redis = get_redis_connection("default")
-# job_redis: Redis = get_redis_connection("job")
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterable
+from .client import createClient, isCluster, tagKey
 import json
 import pickle
+from ..metrics import observe
+from .analyzer import sampleKey
+
+if TYPE_CHECKING:
+    from redis import Redis
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def getRedis() -> "Redis":
+    """
+    获取Redis客户端（单节点 / Cluster / 客户端分片，见 COMM_CACHE_MODE）。
+    首次调用时才创建，导入本模块不会建立连接。
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = createClient()
+    return _client
+
+
+def __getattr__(name: str) -> Any:
+    # 兼容旧用法 from .redis import redis
+    if name == "redis":
+        return getRedis()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class CommCache:
     """
     通用缓存类，提供对Redis缓存的基本操作。
     """
+    # 指标标签中的键前缀，为空时按键名推导（见 utils.metrics.keyPrefix）
+    metrics_prefix = None
+    # 熔断时 get 是否可返回进程内回退缓存中的旧值（见 utils.cache.breaker）
+    local_fallback = True
+
     @classmethod
     def dataProcess(cls, data: any, pick_ser: bool = False, json_ser: bool = False, method: str = None) -> any:
         """
@@ -33,7 +64,9 @@ class CommCache:
         删除缓存中的数据。
         :param new_key: 要删除的键
         """
-        redis.delete(cache_key)
+        sampleKey(cache_key)
+        with observe("cache.delete", key=cache_key, prefix=cls.metrics_prefix, phase="cache"):
+            getRedis().delete(cache_key)
 
     @classmethod
     def ttl(cls, cache_key: str) -> int:
@@ -42,7 +75,9 @@ class CommCache:
         :param key: 缓存键
         :return: 剩余生存时间（秒）
         """
-        return redis.ttl(cache_key)
+        sampleKey(cache_key)
+        with observe("cache.ttl", key=cache_key, prefix=cls.metrics_prefix, phase="cache"):
+            return getRedis().ttl(cache_key)
 
     @classmethod
     def get(cls, cache_key: str, pick_ser: bool = False, json_ser: bool = False) -> any:
@@ -53,10 +88,17 @@ class CommCache:
         :param json_ser: 是否使用json反序列化
         :return: 获取的数据
         """
-        data = redis.get(cache_key)
+        sampleKey(cache_key)
+        with observe("cache.get", key=cache_key, prefix=cls.metrics_prefix, phase="cache") as ob:
+            client = getRedis()
+            # 按类型查找，避免分片客户端的 __getattr__ 把任意属性当作命令
+            getter = None if cls.local_fallback else getattr(type(client), "getWithoutFallback", None)
+            data = getter(client, cache_key) if getter else client.get(cache_key)
+            ob.hit = data is not None
+            ob.size = len(data) if data else 0
 
-        if data:
-            data = cls.dataProcess(data, pick_ser=pick_ser, json_ser=json_ser, method="loads")
+            if data:
+                data = cls.dataProcess(data, pick_ser=pick_ser, json_ser=json_ser, method="loads")
         return data
 
     @classmethod
@@ -71,12 +113,91 @@ class CommCache:
             json_ser (bool, optional): 是否使用json序列化。默认为False。
             Returns: None
         """
-        data = cls.dataProcess(data, pick_ser=pick_ser, json_ser=json_ser, method="dumps")
+        sampleKey(cache_key)
+        with observe("cache.set", key=cache_key, prefix=cls.metrics_prefix, phase="cache") as ob:
+            data = cls.dataProcess(data, pick_ser=pick_ser, json_ser=json_ser, method="dumps")
+            if isinstance(data, (bytes, str)):
+                ob.size = len(data)
+
+            if timeout:
+                getRedis().set(cache_key, data, ex=timeout)
+            else:
+                getRedis().set(cache_key, data)
+
+    @classmethod
+    def tagKey(cls, prefix: str, tag: Any, *parts: Any) -> str:
+        """
+        生成带 hash tag 的键，同一 tag 的键位于同一节点/槽位。
+        :param prefix: 键前缀
+        :param tag: 分组标识（如用户ID）
+        :return: 如 "sessions:{42}"
+        """
+        return tagKey(prefix, tag, *parts)
+
+    @classmethod
+    def pipeline(cls, transaction: bool = True):
+        """
+        获取流水线（cluster/sharded 模式下按节点分组执行，仅单节点内原子）。
+        :param transaction: 是否使用 MULTI/EXEC
+        """
+        client = getRedis()
+        if isCluster(client):
+            # RedisCluster 流水线不支持跨槽位事务
+            return client.pipeline()
+        return client.pipeline(transaction=transaction)
+
+    @classmethod
+    def getMany(cls, cache_keys: Iterable[str], pick_ser: bool = False, json_ser: bool = False) -> Dict[str, Any]:
+        """
+        批量获取缓存数据（cluster/sharded 模式下按节点分组并行获取）。
+        :param cache_keys: 缓存键列表
+        :return: {键: 数据}，未命中的键不在结果中
+        """
+        cache_keys = list(cache_keys)
+        if not cache_keys:
+            return {}
+        with observe("cache.get_many", prefix=cls.metrics_prefix or "-", phase="cache") as ob:
+            client = getRedis()
+            values = client.mget_nonatomic(cache_keys) if isCluster(client) else client.mget(cache_keys)
+            ob.size = sum(len(value) for value in values if value)
+            result = {}
+            for cache_key, value in zip(cache_keys, values):
+                if value is not None:
+                    result[cache_key] = cls.dataProcess(value, pick_ser=pick_ser, json_ser=json_ser, method="loads") if value else value
+        return result
 
-        if timeout:
-            redis.set(cache_key, data, ex=timeout)
-        else:
-            redis.set(cache_key, data)
+    @classmethod
+    def setMany(cls, mapping: Dict[str, Any], timeout: int = None, pick_ser: bool = False, json_ser: bool = False) -> None:
+        """
+        批量设置缓存数据（单次流水线，cluster/sharded 模式下各节点并行执行）。
+        :param mapping: {键: 数据}
+        :param timeout: 过期时间（秒），为空表示不过期
+        """
+        if not mapping:
+            return
+        with observe("cache.set_many", prefix=cls.metrics_prefix or "-", phase="cache") as ob:
+            size = 0
+            pipe = cls.pipeline(transaction=False)
+            for cache_key, data in mapping.items():
+                data = cls.dataProcess(data, pick_ser=pick_ser, json_ser=json_ser, method="dumps")
+                if isinstance(data, (bytes, str)):
+                    size += len(data)
+                pipe.set(cache_key, data, ex=timeout or None)
+            pipe.execute()
+            ob.size = size
+
+    @classmethod
+    def deleteMany(cls, cache_keys: Iterable[str]) -> int:
+        """
+        批量删除缓存数据。
+        :param cache_keys: 缓存键列表
+        :return: 删除的键数量
+        """
+        cache_keys = list(cache_keys)
+        if not cache_keys:
+            return 0
+        with observe("cache.delete_many", prefix=cls.metrics_prefix or "-", phase="cache"):
+            return getRedis().delete(*cache_keys)
 
     @classmethod
     def sadd(cls, cache_key: str, *value: any) -> None:
@@ -85,7 +206,9 @@ class CommCache:
         :param value: 要添加的成员
         :param key: 集合键
         """
-        redis.sadd(cache_key, *value)
+        sampleKey(cache_key)
+        with observe("cache.sadd", key=cache_key, prefix=cls.metrics_prefix, phase="cache"):
+            getRedis().sadd(cache_key, *value)
 
     @classmethod
     def sismember(cls, cache_key: str, value: any) -> bool:
@@ -95,7 +218,9 @@ class CommCache:
         :param key: 集合键
         :return: 是否是集合的成员
         """
-        result = redis.sismember(cache_key, value)
+        sampleKey(cache_key)
+        with observe("cache.sismember", key=cache_key, prefix=cls.metrics_prefix, phase="cache"):
+            result = getRedis().sismember(cache_key, value)
         return result
 
 
@@ -107,7 +232,11 @@ def redisExist(key: str, time: int, value: int = 1) -> bool:
     :param value: 键值
     :return: 是否存在
     """
-    if redis.exists(key):
-        return True
-    redis.set(key, value, time)
+    sampleKey(key)
+    with observe("cache.exist", key=key, phase="cache") as ob:
+        client = getRedis()
+        ob.hit = bool(client.exists(key))
+        if ob.hit:
+            return True
+        client.set(key, value, time)
     return False
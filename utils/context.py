@@ -0,0 +1,101 @@
+"""
+请求上下文模块
+
+基于 contextvars 保存当前请求的请求ID与各阶段耗时，同步/异步视图通用。
+未处于请求上下文（如管理命令、后台任务）时所有记录操作均为空操作。
+"""
+import functools
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+# 阶段名 => [累计耗时(秒), 次数]
+_timings: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("request_timings", default=None)
+
+
+def getRequestId() -> Optional[str]:
+    """当前请求ID"""
+    return _request_id.get()
+
+
+def setRequestId(request_id: Optional[str]) -> Token:
+    """设置当前请求ID，返回用于恢复的 Token"""
+    return _request_id.set(request_id)
+
+
+def resetRequestId(token: Token) -> None:
+    _request_id.reset(token)
+
+
+def startTimings() -> Token:
+    """开启当前上下文的耗时统计"""
+    return _timings.set({})
+
+
+def getTimings() -> Optional[Dict[str, List[float]]]:
+    """当前上下文的耗时统计，未开启时返回 None"""
+    return _timings.get()
+
+
+def resetTimings(token: Token) -> None:
+    _timings.reset(token)
+
+
+def addTiming(phase: str, seconds: float) -> None:
+    """累加某阶段耗时"""
+    timings = _timings.get()
+    if timings is None:
+        return
+    entry = timings.get(phase)
+    if entry is None:
+        timings[phase] = [seconds, 1]
+    else:
+        entry[0] += seconds
+        entry[1] += 1
+
+
+@contextmanager
+def timing(phase: str):
+    """
+    统计代码块耗时
+    ===
+    with timing("render"):
+        ...
+    """
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        addTiming(phase, perf_counter() - start)
+
+
+def timed(phase: str) -> Callable:
+    """统计函数耗时的装饰器（同步函数）"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _timings.get() is None:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                addTiming(phase, perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    日志过滤器：为日志记录附加 request_id 字段
+    ===
+    LOGGING 中配置后，格式串可直接使用 %(request_id)s
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = _request_id.get() or "-"
+        return True
@@ -1,8 +1,21 @@
 """
 加密解密模块
 """
-from .aes import AESHandler
-from .jwt_ import JWTHandler
+from typing import TYPE_CHECKING
 
+from ..lazy import lazyExports
 
-__all__ = ["AESHandler", "JWTHandler"]
+if TYPE_CHECKING:
+    from .aes import AESHandler
+    from .backends import AESBackend, getBackend
+    from .jwt_ import JWTHandler
+
+
+__all__ = ["AESHandler", "AESBackend", "getBackend", "JWTHandler"]
+
+__getattr__, __dir__ = lazyExports(__name__, {
+    "AESHandler": ".aes",
+    "AESBackend": ".backends",
+    "getBackend": ".backends",
+    "JWTHandler": ".jwt_",
+})
@@ -2,9 +2,9 @@ import base64
 import hashlib
 import os
 from typing import Union, Optional  # 导入类型工具
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad, unpad
 from threading import Thread
+from ..metrics import observe
+from .backends import AESBackend, BLOCK_SIZE, getBackend
 
 
 class AESHandler:
@@ -16,21 +16,24 @@ class AESHandler:
     - 自动生成符合长度的随机密钥
     - 自动管理IV向量（加密时生成，解密时提取）
     - 异常处理与详细错误提示
+    - 可切换加解密后端（cryptography / pycryptodome），密文格式一致
     """
     # AES块大小固定为16字节
-    BLOCK_SIZE: int = AES.block_size
+    BLOCK_SIZE: int = BLOCK_SIZE
 
-    def __init__(self, key: Optional[str] = None):
+    def __init__(self, key: Optional[str] = None, backend: Union[str, AESBackend, None] = None):
         """
         初始化AES工具
 
         :param key: 加密密钥（字符串），若为None则使用默认密钥
                     要求：utf-8编码后长度必须为16/24/32字节（对应128/192/256位）
+        :param backend: 加解密后端名称或实例，为None时按 settings.AES_BACKEND 选择（默认 cryptography 优先）
         """
         # 默认密钥（确保utf-8编码后为16字节）
         defaultKey: str = "okmnhytfcde2025^"
         self.key: bytes = key.encode("utf-8") if key else defaultKey.encode("utf-8")
         self._validateKey()
+        self.backend: AESBackend = getBackend(backend)
 
     def _validateKey(self) -> None:
         """验证密钥长度是否符合AES要求"""
@@ -71,33 +74,31 @@ class AESHandler:
         :param data: 待加密数据（字符串或字节）
         :return: 加密后的Base64字符串（格式：IV+密文 拼接后编码）
         """
-        try:
-            # 处理输入数据（转为字节）
-            if isinstance(data, str):
-                dataBytes: bytes = data.encode("utf-8")
-            elif isinstance(data, bytes):
-                dataBytes: bytes = data
-            else:
-                raise TypeError("输入数据必须是字符串或字节")
+        with observe("aes.encrypt", prefix="-", phase="crypto") as ob:
+            try:
+                # 处理输入数据（转为字节）
+                if isinstance(data, str):
+                    dataBytes: bytes = data.encode("utf-8")
+                elif isinstance(data, bytes):
+                    dataBytes: bytes = data
+                else:
+                    raise TypeError("输入数据必须是字符串或字节")
+                ob.size = len(dataBytes)
 
-            # 生成随机IV（CBC模式必须，长度=块大小16字节）
-            iv: bytes = os.urandom(self.BLOCK_SIZE)
+                # 生成随机IV（CBC模式必须，长度=块大小16字节）
+                iv: bytes = os.urandom(self.BLOCK_SIZE)
 
-            # 初始化加密器
-            cipher = AES.new(self.key, AES.MODE_CBC, iv)
+                # 填充数据并加密
+                encryptedBytes: bytes = self.backend.encrypt(self.key, iv, dataBytes)
 
-            # 填充数据并加密
-            paddedData: bytes = pad(dataBytes, self.BLOCK_SIZE, style="pkcs7")
-            encryptedBytes: bytes = cipher.encrypt(paddedData)
+                # 拼接IV和密文（IV用于解密，需一起传输）
+                combined: bytes = iv + encryptedBytes
 
-            # 拼接IV和密文（IV用于解密，需一起传输）
-            combined: bytes = iv + encryptedBytes
+                # Base64编码为字符串（移除换行符）
+                return base64.b64encode(combined).decode("utf-8").replace("\n", "")
 
-            # Base64编码为字符串（移除换行符）
-            return base64.b64encode(combined).decode("utf-8").replace("\n", "")
-
-        except Exception as e:
-            raise RuntimeError(f"加密失败：{str(e)}")
+            except Exception as e:
+                raise RuntimeError(f"加密失败：{str(e)}")
 
     def decrypt(self, encryptedStr: Union[str, bytes]) -> str:
         """
@@ -106,40 +107,38 @@ class AESHandler:
         :param encryptedStr: 加密后的Base64字符串或字节
         :return: 解密后的原始字符串
         """
-        try:
-            # 处理输入数据（转为字节）
-            if isinstance(encryptedStr, str):
-                encryptedBytes: bytes = encryptedStr.encode("utf-8")
-            elif isinstance(encryptedStr, bytes):
-                encryptedBytes: bytes = encryptedStr
-            else:
-                raise TypeError("输入数据必须是字符串或字节")
-
-            # Base64解码
-            combined: bytes = base64.b64decode(encryptedBytes)
-
-            # 拆分IV（前16字节）和密文
-            iv: bytes = combined[:self.BLOCK_SIZE]
-            ciphertext: bytes = combined[self.BLOCK_SIZE:]
-
-            # 初始化解密器
-            cipher = AES.new(self.key, AES.MODE_CBC, iv)
-
-            # 解密并去除填充
-            decryptedBytes: bytes = cipher.decrypt(ciphertext)
-            unpaddedData: bytes = unpad(decryptedBytes, self.BLOCK_SIZE, style="pkcs7")
-
-            # 解码为字符串
-            return unpaddedData.decode("utf-8")
-
-        except (ValueError, IndexError) as e:
-            # 填充错误或数据格式错误（最常见的解密失败原因）
-            raise RuntimeError(f"解密失败（数据损坏或密钥错误）：{str(e)}")
-        except Exception as e:
-            raise RuntimeError(f"解密失败：{str(e)}")
-
-
-# 测试代码
+        with observe("aes.decrypt", prefix="-", phase="crypto") as ob:
+            try:
+                # 处理输入数据（转为字节）
+                if isinstance(encryptedStr, str):
+                    encryptedBytes: bytes = encryptedStr.encode("utf-8")
+                elif isinstance(encryptedStr, bytes):
+                    encryptedBytes: bytes = encryptedStr
+                else:
+                    raise TypeError("输入数据必须是字符串或字节")
+                ob.size = len(encryptedBytes)
+
+                # Base64解码
+                combined: bytes = base64.b64decode(encryptedBytes)
+
+                # 拆分IV（前16字节）和密文
+                iv: bytes = combined[:self.BLOCK_SIZE]
+                ciphertext: bytes = combined[self.BLOCK_SIZE:]
+
+                # 解密并去除填充
+                unpaddedData: bytes = self.backend.decrypt(self.key, iv, ciphertext)
+
+                # 解码为字符串
+                return unpaddedData.decode("utf-8")
+
+            except (ValueError, IndexError) as e:
+                # 填充错误或数据格式错误（最常见的解密失败原因）
+                raise RuntimeError(f"解密失败（数据损坏或密钥错误）：{str(e)}")
+            except Exception as e:
+                raise RuntimeError(f"解密失败：{str(e)}")
+
+
+# 测试代码（相对导入，需以模块方式运行：python -m <包名>.utils.crypto.aes）
 if __name__ == "__main__":
     # 测试1：使用默认密钥
     aes = AESHandler()
@@ -152,7 +151,8 @@ if __name__ == "__main__":
     print(f"解密是否一致：{decrypted == testStr}\n")
 
     # 测试2：使用自定义密钥
-    customKey: str = AESHandler.generateRandomKey(128)  # 生成随机128位密钥
+    # generateRandomKey 返回 base64 文本（128 位为 22 个字符），不能直接作为密钥，这里使用固定的 16 字节密钥
+    customKey: str = "my_custom_key_16"
     print(f"自定义密钥：{customKey}")
     aesCustom = AESHandler(customKey)
     testJson: str = '{"name": "张三", "age": 25, "is_student": false}'
@@ -162,7 +162,7 @@ if __name__ == "__main__":
 
     # 测试3：异常情况（错误密钥解密）
     try:
-        aesWrong = AESHandler("wrong_key_12345")  # 16字节的错误密钥
+        aesWrong = AESHandler("wrong_key_123456")  # 16字节的错误密钥
         aesWrong.decrypt(encrypted)
     except RuntimeError as e:
         print(f"预期异常：{e}")
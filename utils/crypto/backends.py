@@ -0,0 +1,125 @@
+"""
+AES-CBC 加解密后端
+
+- cryptography：基于 OpenSSL（支持 AES-NI），默认优先使用
+- pycryptodome：原有实现，cryptography 不可用时回退
+
+两个后端均为 AES-CBC + PKCS7 填充，相同密钥与 IV 下输出的密文逐字节一致，可随时切换。
+
+settings:
+    AES_BACKEND: "auto"（默认，cryptography 优先）| "cryptography" | "pycryptodome"
+"""
+from functools import lru_cache
+from typing import Dict, List, Type, Union
+
+from django.conf import settings
+
+BLOCK_SIZE = 16
+
+
+class AESBackend:
+    """
+    后端基类
+    ===
+    encrypt 负责 PKCS7 填充，decrypt 负责去除填充；
+    数据长度或填充不合法时抛出 ValueError
+    """
+    name = ""
+
+    def encrypt(self, key: bytes, iv: bytes, plaintext: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decrypt(self, key: bytes, iv: bytes, ciphertext: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class CryptographyBackend(AESBackend):
+    """OpenSSL 实现（cryptography）"""
+    name = "cryptography"
+
+    def __init__(self):
+        from cryptography.hazmat.primitives import padding
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+        self._padding = padding
+        self._Cipher = Cipher
+        self._AES = algorithms.AES
+        self._CBC = modes.CBC
+
+    def encrypt(self, key: bytes, iv: bytes, plaintext: bytes) -> bytes:
+        padder = self._padding.PKCS7(BLOCK_SIZE * 8).padder()
+        padded = padder.update(plaintext) + padder.finalize()
+        encryptor = self._Cipher(self._AES(key), self._CBC(iv)).encryptor()
+        return encryptor.update(padded) + encryptor.finalize()
+
+    def decrypt(self, key: bytes, iv: bytes, ciphertext: bytes) -> bytes:
+        decryptor = self._Cipher(self._AES(key), self._CBC(iv)).decryptor()
+        padded = decryptor.update(ciphertext) + decryptor.finalize()
+        unpadder = self._padding.PKCS7(BLOCK_SIZE * 8).unpadder()
+        return unpadder.update(padded) + unpadder.finalize()
+
+
+class PycryptodomeBackend(AESBackend):
+    """pycryptodome 实现"""
+    name = "pycryptodome"
+
+    def __init__(self):
+        from Crypto.Cipher import AES
+        from Crypto.Util.Padding import pad, unpad
+        self._AES = AES
+        self._pad = pad
+        self._unpad = unpad
+
+    def encrypt(self, key: bytes, iv: bytes, plaintext: bytes) -> bytes:
+        cipher = self._AES.new(key, self._AES.MODE_CBC, iv)
+        return cipher.encrypt(self._pad(plaintext, BLOCK_SIZE, style="pkcs7"))
+
+    def decrypt(self, key: bytes, iv: bytes, ciphertext: bytes) -> bytes:
+        cipher = self._AES.new(key, self._AES.MODE_CBC, iv)
+        return self._unpad(cipher.decrypt(ciphertext), BLOCK_SIZE, style="pkcs7")
+
+
+# 按优先级排列（auto 时依次尝试）
+BACKENDS: Dict[str, Type[AESBackend]] = {
+    CryptographyBackend.name: CryptographyBackend,
+    PycryptodomeBackend.name: PycryptodomeBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def _load(name: str) -> AESBackend:
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"未知的 AES 后端：{name}（可选：{', '.join(BACKENDS)}）") from None
+    return backend_class()
+
+
+def availableBackends() -> List[str]:
+    """当前环境可用的后端名称"""
+    names = []
+    for name in BACKENDS:
+        try:
+            _load(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def getBackend(backend: Union[str, AESBackend, None] = None) -> AESBackend:
+    """
+    获取后端实例（同名后端全局共享）
+    :param backend: 后端名称或实例，为空时读取 settings.AES_BACKEND
+    """
+    if isinstance(backend, AESBackend):
+        return backend
+    # Django 未配置时（脚本中单独使用）按 auto 选择
+    name = backend or (getattr(settings, "AES_BACKEND", "auto") if settings.configured else "auto")
+    if name != "auto":
+        return _load(name)
+    for candidate in BACKENDS:
+        try:
+            return _load(candidate)
+        except ImportError:
+            continue
+    raise ImportError("未安装可用的 AES 后端，请安装 cryptography 或 pycryptodome")
@@ -3,6 +3,9 @@ import logging
 from typing import Any, Mapping, Optional
 
 import jwt
+from django.conf import settings
+
+from ..metrics import observe
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +15,24 @@ DEFAULT_ALGORITHM = "HS256"
 DEFAULT_EXPIRES_IN = 60 * 60 * 24 * 7  # 7天（秒）
 DEFAULT_ISSUER = "jwt_handler"
 DEFAULT_LEEWAY = 5  # 时间验证宽容度（秒）
+# 声明 => 用户属性 映射，encode(user=...) 时写入载荷，TokenUser 按此还原属性
+DEFAULT_USER_CLAIMS = {"user_id": "id"}
+
+
+def getUserClaims() -> dict:
+    """
+    声明 => 用户属性 映射（settings.JWT_USER_CLAIMS，签发与认证共用）
+    ===
+    Django 未配置时（脚本中单独使用）返回默认映射
+    """
+    if settings.configured:
+        return dict(getattr(settings, "JWT_USER_CLAIMS", DEFAULT_USER_CLAIMS))
+    return dict(DEFAULT_USER_CLAIMS)
+
+
+def getUserIdClaim(user_claims: Mapping[str, str]) -> str:
+    """映射到用户 id 的声明名（与 TokenUser.pk 一致），未配置时为 user_id"""
+    return next((claim for claim, attr in user_claims.items() if attr == "id"), "user_id")
 
 
 class JWTDecodeError(Exception):
@@ -30,7 +51,8 @@ class JWTHandler:
         algorithm: str = DEFAULT_ALGORITHM,
         expires_in: int = DEFAULT_EXPIRES_IN,
         issuer: str = DEFAULT_ISSUER,
-        leeway: int = DEFAULT_LEEWAY
+        leeway: int = DEFAULT_LEEWAY,
+        user_claims: Optional[Mapping[str, str]] = None
     ):
         """
         初始化JWT工具类
@@ -41,24 +63,34 @@ class JWTHandler:
             expires_in: 默认过期时间（秒，默认7天）
             issuer: 签发者标识（默认"jwt_handler"）
             leeway: 时间验证宽容度（秒，默认5秒，处理服务器时间偏差）
+            user_claims: 声明名 => 用户属性名 映射（默认读取 settings.JWT_USER_CLAIMS，见 getUserClaims）
         """
         self.secret = secret
         self.algorithm = algorithm
         self.expires_in = expires_in
         self.issuer = issuer
         self.leeway = leeway
+        self.user_claims = dict(user_claims) if user_claims else getUserClaims()
 
-    def _buildPayload(self, payload: Mapping[str, Any], expires_in: Optional[int]) -> dict:
+    def _buildPayload(self, payload: Mapping[str, Any], expires_in: Optional[int], user: Any = None) -> dict:
         """
         构建JWT载荷（添加标准字段）
 
         Args:
             payload: 自定义载荷数据
             expires_in: 覆盖默认过期时间（秒）；传0表示永不过期
+            user: 用户对象，按 user_claims 映射写入声明（payload 中已有的声明不覆盖）
         Returns:
             完整的JWT载荷字典
         """
         result = dict(payload)
+        if user is not None:
+            for claim, attr in self.user_claims.items():
+                value = getattr(user, attr, None)
+                # 非 JSON 基础类型（如 UUID 主键）转为字符串
+                if value is not None and not isinstance(value, (str, int, float, bool, list, dict)):
+                    value = str(value)
+                result.setdefault(claim, value)
         # 签发时间（带UTC时区的时间）
         issued_at = datetime.datetime.now(datetime.UTC)
         # 设置签发者（默认使用实例配置的issuer）
@@ -71,21 +103,24 @@ class JWTHandler:
             result["exp"] = issued_at + datetime.timedelta(seconds=ttl)
         return result
 
-    def encode(self, payload: Mapping[str, Any], expires_in: Optional[int] = None) -> str:
+    def encode(self, payload: Optional[Mapping[str, Any]] = None, expires_in: Optional[int] = None, user: Any = None) -> str:
         """
         将载荷编码为JWT字符串
 
         Args:
             payload: 可JSON序列化的任意数据（如字典）
             expires_in: 可选，覆盖默认过期时间（秒）；传0表示永不过期
+            user: 可选，用户对象，按 user_claims 映射写入声明
         Returns:
             编码后的JWT字符串
         """
-        full_payload = self._buildPayload(payload, expires_in)
-        token = jwt.encode(full_payload, self.secret, algorithm=self.algorithm)
-        # 兼容旧版PyJWT（可能返回bytes类型）
-        if isinstance(token, bytes):
-            token = token.decode("utf-8")
+        with observe("jwt.encode", prefix="-", phase="crypto") as ob:
+            full_payload = self._buildPayload(payload or {}, expires_in, user)
+            token = jwt.encode(full_payload, self.secret, algorithm=self.algorithm)
+            # 兼容旧版PyJWT（可能返回bytes类型）
+            if isinstance(token, bytes):
+                token = token.decode("utf-8")
+            ob.size = len(token)
         return token
 
     def decode(self, token: str, verify_exp: bool = True) -> dict:
@@ -100,26 +135,29 @@ class JWTHandler:
         Raises:
             JWTDecodeError: 解码失败或验证不通过时抛出
         """
-        try:
-            decoded = jwt.decode(
-                token,
-                self.secret,
-                algorithms=[self.algorithm],
-                options={
-                    "verify_exp": verify_exp,
-                    "require": ["iat"]
-                },
-                leeway=self.leeway
-            )
-        except jwt.ExpiredSignatureError as exc:
-            logger.debug("JWT已过期: %s", exc)
-            raise JWTDecodeError("令牌已过期") from exc
-        except jwt.PyJWTError as exc:
-            logger.debug("JWT解码失败: %s", exc)
-            raise JWTDecodeError("无效的令牌") from exc
+        with observe("jwt.decode", prefix="-", phase="crypto") as ob:
+            ob.size = len(token) if token else 0
+            try:
+                decoded = jwt.decode(
+                    token,
+                    self.secret,
+                    algorithms=[self.algorithm],
+                    options={
+                        "verify_exp": verify_exp,
+                        "require": ["iat"]
+                    },
+                    leeway=self.leeway
+                )
+            except jwt.ExpiredSignatureError as exc:
+                logger.debug("JWT已过期: %s", exc)
+                raise JWTDecodeError("令牌已过期") from exc
+            except jwt.PyJWTError as exc:
+                logger.debug("JWT解码失败: %s", exc)
+                raise JWTDecodeError("无效的令牌") from exc
         return decoded
 
 
+# 测试代码（相对导入，需以模块方式运行：python -m <包名>.utils.crypto.jwt_）
 if __name__ == "__main__":
     # 1. 使用默认配置实例化
     default_handler = JWTHandler()
@@ -0,0 +1,39 @@
+"""
+惰性导出
+
+包的 __init__ 通过模块级 __getattr__（PEP 562）在首次访问时才导入子模块，
+导入包本身不再连带导入 pycryptodome / PyJWT / redis 等依赖，也不会建立连接。
+
+用法（包的 __init__.py）：
+    __getattr__, __dir__ = lazyExports(__name__, {"AESHandler": ".aes"})
+"""
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazyExports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    生成包的 __getattr__ 与 __dir__
+    ===
+    Args:
+        package: 包名（传入 __name__）
+        exports: 导出名 => 所在子模块（相对路径，如 ".aes"）
+    Returns:
+        (__getattr__, __dir__)
+    """
+    namespace = sys.modules[package].__dict__
+
+    def __getattr__(name: str) -> Any:
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        # 写回包的命名空间，之后的访问不再经过 __getattr__
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted({*namespace, *exports})
+
+    return __getattr__, __dir__
@@ -0,0 +1,269 @@
+"""
+指标采集模块
+
+记录缓存、加解密等操作的耗时、数据大小、命中率与错误数，按操作名与键前缀分组。
+导出器可插拔：默认 NoopExporter（不采集，仅一次属性判断的开销），
+配置 METRICS_EXPORTER = "<pkg>.utils.metrics.PrometheusExporter" 后可通过 metricsView 输出 Prometheus 文本格式。
+
+settings:
+    METRICS_EXPORTER: 导出器类的导入路径，默认不采集
+    METRICS_NAMESPACE: 指标名前缀，默认 "drf"
+"""
+import bisect
+import threading
+from time import perf_counter
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .context import addTiming
+
+# 耗时分桶（秒）
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# 数据大小分桶（字节）
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def keyPrefix(cache_key, separator: str = ":") -> str:
+    """
+    提取缓存键前缀作为指标标签
+    ===
+    "user:1:profile" => "user"；无分隔符的键（如原始令牌）统一归为 "-"，避免标签基数失控
+    """
+    if isinstance(cache_key, bytes):
+        cache_key = cache_key.decode("utf-8", "replace")
+    if not isinstance(cache_key, str) or separator not in cache_key:
+        return "-"
+    return cache_key.split(separator, 1)[0]
+
+
+class MetricsExporter:
+    """导出器基类"""
+
+    # 为 False 时跳过全部采集逻辑
+    enabled = True
+
+    def observe(
+        self,
+        operation: str,
+        seconds: float,
+        prefix: str = "-",
+        size: Optional[int] = None,
+        hit: Optional[bool] = None,
+        error: bool = False,
+    ) -> None:
+        raise NotImplementedError
+
+    def increment(self, name: str, labels: Optional[Dict[str, str]] = None, value: float = 1) -> None:
+        """通用计数器（如熔断器状态切换次数）"""
+        raise NotImplementedError
+
+
+class NoopExporter(MetricsExporter):
+    """默认导出器：不采集"""
+
+    enabled = False
+
+    def observe(self, operation, seconds, prefix="-", size=None, hit=None, error=False) -> None:
+        return None
+
+    def increment(self, name, labels=None, value=1) -> None:
+        return None
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class _Series:
+    __slots__ = ("latency", "size", "hits", "misses", "errors")
+
+    def __init__(self):
+        self.latency = _Histogram(LATENCY_BUCKETS)
+        self.size = _Histogram(SIZE_BUCKETS)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+
+class PrometheusExporter(MetricsExporter):
+    """
+    进程内聚合，输出 Prometheus 文本格式
+    ===
+    多进程部署（gunicorn 多 worker）时每个进程独立统计，由 Prometheus 按实例抓取聚合
+    """
+
+    def __init__(self, namespace: Optional[str] = None):
+        self.namespace = namespace or getattr(settings, "METRICS_NAMESPACE", "drf")
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+    def observe(self, operation, seconds, prefix="-", size=None, hit=None, error=False) -> None:
+        key = (operation, prefix)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+            series.latency.add(seconds)
+            if size is not None:
+                series.size.add(size)
+            if hit is True:
+                series.hits += 1
+            elif hit is False:
+                series.misses += 1
+            if error:
+                series.errors += 1
+
+    def increment(self, name, labels=None, value=1) -> None:
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self._counters.clear()
+
+    @staticmethod
+    def _labels(**labels) -> str:
+        parts = []
+        for name, value in labels.items():
+            value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+            parts.append(f'{name}="{value}"')
+        return "{" + ",".join(parts) + "}"
+
+    def _renderHistogram(self, lines: list, name: str, histogram: _Histogram, labels: dict) -> None:
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{self._labels(**labels, le=repr(float(bound)))} {cumulative}")
+        lines.append(f"{name}_bucket{self._labels(**labels, le='+Inf')} {histogram.count}")
+        lines.append(f"{name}_sum{self._labels(**labels)} {histogram.total}")
+        lines.append(f"{name}_count{self._labels(**labels)} {histogram.count}")
+
+    def render(self) -> str:
+        """Prometheus 文本格式（exposition format 0.0.4）"""
+        ns = self.namespace
+        with self._lock:
+            series = sorted(self._series.items())
+            counters = sorted(self._counters.items())
+            lines = [
+                f"# HELP {ns}_operation_duration_seconds 操作耗时",
+                f"# TYPE {ns}_operation_duration_seconds histogram",
+            ]
+            for (operation, prefix), item in series:
+                self._renderHistogram(lines, f"{ns}_operation_duration_seconds", item.latency, {"operation": operation, "prefix": prefix})
+
+            lines += [f"# HELP {ns}_operation_bytes 操作数据大小", f"# TYPE {ns}_operation_bytes histogram"]
+            for (operation, prefix), item in series:
+                if item.size.count:
+                    self._renderHistogram(lines, f"{ns}_operation_bytes", item.size, {"operation": operation, "prefix": prefix})
+
+            for metric, attr, help_text in (
+                ("cache_hits_total", "hits", "缓存命中次数"),
+                ("cache_misses_total", "misses", "缓存未命中次数"),
+                ("operation_errors_total", "errors", "操作错误次数"),
+            ):
+                lines += [f"# HELP {ns}_{metric} {help_text}", f"# TYPE {ns}_{metric} counter"]
+                for (operation, prefix), item in series:
+                    value = getattr(item, attr)
+                    if value or attr == "errors":
+                        lines.append(f"{ns}_{metric}{self._labels(operation=operation, prefix=prefix)} {value}")
+
+            typed = set()
+            for (name, labels), value in counters:
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {ns}_{name} counter")
+                lines.append(f"{ns}_{name}{self._labels(**dict(labels))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+_exporter: Optional[MetricsExporter] = None
+
+
+_noop = NoopExporter()
+
+
+def getExporter() -> MetricsExporter:
+    """
+    当前导出器（首次调用时按 METRICS_EXPORTER 配置创建）
+    ===
+    Django 未配置时（脚本中单独使用 AESHandler/JWTHandler 等）返回 NoopExporter，且不缓存
+    """
+    global _exporter
+    if _exporter is None:
+        if not settings.configured:
+            return _noop
+        path = getattr(settings, "METRICS_EXPORTER", None)
+        _exporter = import_string(path)() if path else NoopExporter()
+    return _exporter
+
+
+def setExporter(exporter: Optional[MetricsExporter]) -> None:
+    """替换导出器；传 None 时下次按配置重新创建"""
+    global _exporter
+    _exporter = exporter
+
+
+class Observation:
+    """
+    单次操作的观测上下文
+    ===
+    with observe("cache.get", key=cache_key, phase="cache") as ob:
+        data = redis.get(cache_key)
+        ob.size = len(data) if data else 0
+        ob.hit = data is not None
+    """
+    __slots__ = ("operation", "key", "prefix", "phase", "size", "hit", "start")
+
+    def __init__(self, operation: str, key=None, prefix: Optional[str] = None, phase: Optional[str] = None):
+        self.operation = operation
+        self.key = key
+        self.prefix = prefix
+        self.phase = phase
+        self.size = None
+        self.hit = None
+
+    def __enter__(self) -> "Observation":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        elapsed = perf_counter() - self.start
+        if self.phase is not None:
+            addTiming(self.phase, elapsed)
+        exporter = _exporter or getExporter()
+        if exporter.enabled:
+            prefix = self.prefix or keyPrefix(self.key)
+            exporter.observe(self.operation, elapsed, prefix, self.size, self.hit, exc_type is not None)
+        return False
+
+
+def observe(operation: str, key=None, prefix: Optional[str] = None, phase: Optional[str] = None) -> Observation:
+    """创建观测上下文，key 用于推导前缀标签（prefix 优先）"""
+    return Observation(operation, key=key, prefix=prefix, phase=phase)
+
+
+def metricsView(request):
+    """Prometheus 抓取端点（导出器不支持文本输出时返回 404）"""
+    from django.http import Http404, HttpResponse
+
+    exporter = getExporter()
+    render = getattr(exporter, "render", None)
+    if render is None:
+        raise Http404("metrics exporter is not enabled")
+    return HttpResponse(render(), content_type="text/plain; version=0.0.4; charset=utf-8")